@@ -9,7 +9,8 @@ import os
 import json
 from datetime import datetime
 from typing import List, Dict
-import requests
+
+from http_session import get_session
 
 class GrokTwitterBot:
     """
@@ -180,7 +181,7 @@ JSON形式で回答してください。
             if response_format == "json":
                 data["response_format"] = {"type": "json_object"}
             
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = get_session().post(url, headers=headers, json=data, timeout=30, endpoint="xai:chat")
             response.raise_for_status()
             
             result = response.json()
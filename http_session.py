@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for all outbound I/O
+- One keep-alive connection pool per process (TLS sessions are reused)
+- HTTP/2 when httpx + h2 are installed, HTTP/1.1 via requests otherwise
+- Conditional GET (ETag / If-Modified-Since) with a small validator cache
+- Compressed responses (gzip/deflate, plus br/zstd when available)
+- Per-endpoint rate limiting with priorities and 429/Retry-After retries
+- Per-endpoint latency and queue-wait histograms (metrics.registry)
+"""
+import importlib.util
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+from metrics import registry
+from rate_limiter import PRIORITY_SCAN, RateLimitScheduler, parse_retry_after
+
+POOL_SIZE = 32
+MAX_RETRIES = 4
+CONDITIONAL_CACHE_SIZE = 1024
+USER_AGENT = "openclaw-lin/1.0"
+
+
+def _accept_encoding():
+    """Advertise only the encodings we can actually decode"""
+    encodings = ["gzip", "deflate"]
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        encodings.append("br")
+    if importlib.util.find_spec("zstandard"):
+        encodings.append("zstd")
+    return ", ".join(encodings)
+
+
+class SharedSession:
+    """Pooled HTTP client shared by every module in the process"""
+
+    def __init__(self, pool_size=POOL_SIZE, cache_size=CONDITIONAL_CACHE_SIZE):
+        headers = {
+            "User-Agent": USER_AGENT,
+            "Accept-Encoding": _accept_encoding(),
+        }
+
+        if importlib.util.find_spec("httpx") and importlib.util.find_spec("h2"):
+            import httpx
+            self.backend = "httpx"
+            self.client = httpx.Client(
+                http2=True,
+                headers=headers,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            )
+        else:
+            import requests
+            from requests.adapters import HTTPAdapter
+            self.backend = "requests"
+            self.client = requests.Session()
+            self.client.headers.update(headers)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            self.client.mount("https://", adapter)
+            self.client.mount("http://", adapter)
+
+        self.cache_size = cache_size
+        # cache key -> (validators, decoded body)
+        self._validators = OrderedDict()
+        self._lock = threading.Lock()
+        self.scheduler = RateLimitScheduler()
+        self.stats = {"requests": 0, "not_modified": 0, "retries": 0}
+
+    def request(self, method, url, endpoint=None, priority=PRIORITY_SCAN, **kwargs):
+        """
+        Send a request through the pool and return the backend response
+
+        With an ``endpoint`` the call waits for that endpoint's rate-limit
+        token (in ``priority`` order) and retries 429s after Retry-After.
+        """
+        label = endpoint or "other"
+        for attempt in range(MAX_RETRIES + 1):
+            if endpoint:
+                registry.observe("http_queue_wait_seconds", self.scheduler.acquire(endpoint, priority),
+                                 endpoint=endpoint)
+            with self._lock:
+                self.stats["requests"] += 1
+            started = time.perf_counter()
+            response = self.client.request(method, url, **kwargs)
+            registry.observe("http_request_seconds", time.perf_counter() - started, endpoint=label)
+            registry.inc("http_responses_total", endpoint=label, status=response.status_code)
+
+            if response.status_code != 429 or not endpoint:
+                if endpoint:
+                    self.scheduler.succeeded(endpoint)
+                return response
+
+            self.scheduler.throttled(endpoint, parse_retry_after(response.headers.get("Retry-After")))
+            if attempt < MAX_RETRIES:
+                with self._lock:
+                    self.stats["retries"] += 1
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get_json(self, url, params=None, headers=None, timeout=10, conditional=True, loads=json.loads,
+                 endpoint=None, priority=PRIORITY_SCAN):
+        """
+        GET a JSON resource, revalidating with ETag / Last-Modified
+
+        On 304 Not Modified the previously decoded body is returned as-is,
+        so callers must treat the result as read-only. ``loads`` lets callers
+        decode straight into their own record types.
+        """
+        # Bodies are cached decoded, so the decoder is part of the key
+        key = (loads, url + ("?" + urlencode(sorted(params.items())) if params else ""))
+        headers = dict(headers or {})
+
+        cached = None
+        if conditional:
+            with self._lock:
+                cached = self._validators.get(key)
+                if cached is not None:
+                    self._validators.move_to_end(key)
+            if cached is not None:
+                etag, last_modified = cached[0]
+                if etag:
+                    headers["If-None-Match"] = etag
+                if last_modified:
+                    headers["If-Modified-Since"] = last_modified
+
+        response = self.get(url, params=params, headers=headers, timeout=timeout,
+                            endpoint=endpoint, priority=priority)
+
+        if response.status_code == 304 and cached is not None:
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return cached[1]
+
+        response.raise_for_status()
+        with registry.timer("http_decode_seconds", endpoint=endpoint or "other"):
+            body = loads(response.content)
+
+        validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        if conditional and any(validators):
+            with self._lock:
+                self._validators[key] = (validators, body)
+                self._validators.move_to_end(key)
+                while len(self._validators) > self.cache_size:
+                    self._validators.popitem(last=False)
+
+        return body
+
+    def close(self):
+        self.client.close()
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide SharedSession, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = SharedSession()
+    return _session
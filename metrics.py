@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+In-process latency metrics with Prometheus text export
+- LatencyHistogram: HDR-style log-linear buckets (fixed relative error,
+  constant memory, O(1) record) from 1µs to hours
+- MetricsRegistry: labelled histograms, counters and gauges, timer() context manager
+- Export to a Prometheus text file (node_exporter textfile collector) or a
+  local /metrics scrape endpoint
+"""
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUB_BUCKET_BITS = 5          # 32 sub-buckets per power of two: <~3% error
+MIN_VALUE_US = 1
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+METRICS_FILE = "/root/openclaw_data/lin/data/heartbeat_metrics.prom"
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations recorded in seconds"""
+
+    __slots__ = ("counts", "count", "total", "min", "max", "_lock")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(us):
+        us = max(MIN_VALUE_US, int(us))
+        exponent = us.bit_length() - 1
+        if exponent < SUB_BUCKET_BITS:
+            return us
+        shift = exponent - SUB_BUCKET_BITS
+        return ((shift + 1) << SUB_BUCKET_BITS) + (us >> shift) - (1 << SUB_BUCKET_BITS)
+
+    @staticmethod
+    def _upper_us(index):
+        """Largest value (µs) that maps into bucket ``index``"""
+        if index < (1 << SUB_BUCKET_BITS):
+            return index
+        shift = (index >> SUB_BUCKET_BITS) - 1
+        mantissa = (index & ((1 << SUB_BUCKET_BITS) - 1)) + (1 << SUB_BUCKET_BITS)
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, seconds):
+        index = self._index(seconds * 1e6)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total += seconds
+            self.min = min(self.min, seconds)
+            self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """Value (seconds) at quantile ``q`` in [0, 1]"""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(1, math.ceil(q * self.count))
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= target:
+                    return min(self.max, self._upper_us(index) / 1e6)
+        return self.max
+
+
+class MetricsRegistry:
+    """Named, labelled histograms, counters and gauges"""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def histogram(self, name, **labels):
+        key = self._key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram())
+        return histogram
+
+    def observe(self, name, seconds, **labels):
+        self.histogram(name, **labels).record(seconds)
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        self.gauges[self._key(name, labels)] = value
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Time a block: with registry.timer("stage_seconds", stage="sync"): ..."""
+        histogram = self.histogram(name, **labels)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.record(time.perf_counter() - started)
+
+    def summary(self):
+        """{name{labels}: {count, p50_ms, p99_ms, max_ms}} for logs"""
+        result = {}
+        for (name, labels), histogram in list(self.histograms.items()):
+            if not histogram.count:
+                continue
+            result[_series(name, labels)] = {
+                "count": histogram.count,
+                "p50_ms": round(histogram.percentile(0.5) * 1000, 2),
+                "p99_ms": round(histogram.percentile(0.99) * 1000, 2),
+                "max_ms": round(histogram.max * 1000, 2),
+            }
+        return result
+
+    def to_prometheus(self):
+        """Prometheus text exposition: histograms as summaries"""
+        lines = []
+        declared = set()
+        for (name, labels), histogram in sorted(self.histograms.items()):
+            if name not in declared:
+                lines.append(f"# TYPE {name} summary")
+                declared.add(name)
+            for q in QUANTILES:
+                lines.append(f"{_series(name, labels + (('quantile', str(q)),))} {histogram.percentile(q):.6f}")
+            lines.append(f"{_series(name + '_sum', labels)} {histogram.total:.6f}")
+            lines.append(f"{_series(name + '_count', labels)} {histogram.count}")
+        for (name, labels), value in sorted(self.counters.items()):
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            lines.append(f"{_series(name, labels)} {value}")
+        for (name, labels), value in sorted(self.gauges.items()):
+            if name not in declared:
+                lines.append(f"# TYPE {name} gauge")
+                declared.add(name)
+            lines.append(f"{_series(name, labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=METRICS_FILE):
+        """Atomic write so a scraper never sees a partial file"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def serve(self, port=9464, host="127.0.0.1"):
+        """Expose /metrics on a background thread; returns the server"""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        return server
+
+
+def _series(name, labels):
+    if not labels:
+        return name
+    rendered = ",".join(f'{key}="{value}"' for key, value in labels)
+    return f"{name}{{{rendered}}}"
+
+
+# Process-wide registry
+registry = MetricsRegistry()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Per-endpoint token-bucket rate limiter with priority scheduling
+- One bucket per endpoint (e.g. "gamma:markets", "clob:books")
+- Waiters are served by priority class, FIFO within a class, so position
+  refreshes jump ahead of the universe crawl
+- 429 / Retry-After pauses the bucket and halves its rate (AIMD); the rate
+  creeps back to the configured limit on successes
+- Queue-wait metrics per endpoint
+"""
+import heapq
+import itertools
+import threading
+import time
+
+# Priority classes (lower runs first)
+PRIORITY_POSITIONS = 0
+PRIORITY_SCAN = 1
+PRIORITY_CRAWL = 2
+
+# endpoint -> (requests per second, burst)
+DEFAULT_LIMITS = {
+    "gamma:markets": (12.0, 25),
+    "clob:books": (5.0, 10),
+    "clob:book": (20.0, 40),
+    "tavily:search": (2.0, 4),
+    "xai:chat": (1.0, 2),
+}
+
+MIN_RATE_FRACTION = 0.1
+RECOVERY_STEP = 0.05
+
+
+class TokenBucket:
+    """Token bucket with a priority wait queue and adaptive rate"""
+
+    def __init__(self, rate, burst):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.cond = threading.Condition()
+        self.waiters = []
+        self._seq = itertools.count()
+        self.stats = {"acquired": 0, "throttled": 0, "wait_total": 0.0, "wait_max": 0.0}
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, priority=PRIORITY_SCAN):
+        """Block until this caller holds a token; returns seconds spent queued"""
+        started = time.monotonic()
+        entry = (priority, next(self._seq))
+        with self.cond:
+            heapq.heappush(self.waiters, entry)
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if self.waiters[0] == entry and now >= self.blocked_until and self.tokens >= 1:
+                    heapq.heappop(self.waiters)
+                    self.tokens -= 1
+                    break
+                if now < self.blocked_until:
+                    timeout = self.blocked_until - now
+                else:
+                    timeout = max(0.001, (1 - self.tokens) / self.rate)
+                self.cond.wait(timeout)
+            # Let the next waiter re-check immediately
+            self.cond.notify_all()
+
+            waited = time.monotonic() - started
+            self.stats["acquired"] += 1
+            self.stats["wait_total"] += waited
+            self.stats["wait_max"] = max(self.stats["wait_max"], waited)
+        return waited
+
+    def throttled(self, retry_after=None):
+        """Server said 429: pause for Retry-After and halve the rate"""
+        with self.cond:
+            now = time.monotonic()
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self.blocked_until = max(self.blocked_until, now + pause)
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self.tokens = 0.0
+            self.stats["throttled"] += 1
+            self.cond.notify_all()
+
+    def succeeded(self):
+        """Additive recovery towards the configured rate"""
+        if self.rate < self.max_rate:
+            with self.cond:
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+
+class RateLimitScheduler:
+    """Holds one TokenBucket per endpoint; unknown endpoints are unlimited"""
+
+    def __init__(self, limits=None):
+        self.buckets = {
+            endpoint: TokenBucket(rate, burst)
+            for endpoint, (rate, burst) in (limits or DEFAULT_LIMITS).items()
+        }
+
+    def configure(self, endpoint, rate, burst):
+        self.buckets[endpoint] = TokenBucket(rate, burst)
+
+    def acquire(self, endpoint, priority=PRIORITY_SCAN):
+        bucket = self.buckets.get(endpoint)
+        if bucket is None:
+            return 0.0
+        return bucket.acquire(priority)
+
+    def throttled(self, endpoint, retry_after=None):
+        bucket = self.buckets.get(endpoint)
+        if bucket is not None:
+            bucket.throttled(retry_after)
+
+    def succeeded(self, endpoint):
+        bucket = self.buckets.get(endpoint)
+        if bucket is not None:
+            bucket.succeeded()
+
+    def report(self):
+        """Per-endpoint queue-wait and throttling metrics"""
+        report = {}
+        for endpoint, bucket in self.buckets.items():
+            stats = bucket.stats
+            acquired = stats["acquired"]
+            report[endpoint] = {
+                "acquired": acquired,
+                "throttled": stats["throttled"],
+                "wait_avg_ms": round(stats["wait_total"] / acquired * 1000, 2) if acquired else 0.0,
+                "wait_max_ms": round(stats["wait_max"] * 1000, 2),
+                "rate": round(bucket.rate, 2),
+            }
+        return report
+
+
+def parse_retry_after(value):
+    """Retry-After is seconds (HTTP-date form is treated as 1s)"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return 1.0
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Alert state store: deduplication, hysteresis, cooldown and escalation
+
+Alerts are keyed by (market, alert type) and only state transitions are
+emitted:
+  - raised     EV rose above RAISE_EV (and the key is not cooling down)
+  - escalated  EV crossed the next ESCALATION_LEVELS tier
+  - cleared    EV fell below CLEAR_EV, or the opportunity disappeared
+
+A held alert stays silent however many ticks it persists. The gap between
+RAISE_EV and CLEAR_EV (and below each escalation tier) stops an EV that
+hovers around a threshold from flapping. A cleared key cannot re-raise
+until COOLDOWN has passed.
+
+Each tick touches only the scan results (already filtered candidates) and
+the currently active alerts, never the whole market universe.
+"""
+import json
+import os
+import time
+
+STATE_FILE = "/root/openclaw_data/lin/data/alert_state.json"
+
+RAISE_EV = 0.30                          # EV > 30% raises (same bar as before)
+CLEAR_EV = 0.25                          # ... and it clears below 25%
+ESCALATION_LEVELS = (0.30, 0.50, 1.00)   # each tier crossed re-alerts
+HYSTERESIS = 0.05                        # tier drops silently this far below it
+COOLDOWN = 15 * 60                       # seconds before a cleared key may re-raise
+
+HIGH_EV = 'HIGH_EV_OPPORTUNITY'
+
+
+def alert_key(result):
+    """Stable identity of the market or event behind a scan result"""
+    if result.get('market_id') is not None:
+        return str(result['market_id'])
+    if result.get('event_id') is not None:
+        return f"event:{result['event_id']}"
+    return result['market']
+
+
+class AlertEntry:
+    """State for one (key, alert type)"""
+
+    __slots__ = ("key", "alert_type", "market", "active", "level", "ev", "raised_at", "cleared_at")
+
+    def __init__(self, key, alert_type, market):
+        self.key = key
+        self.alert_type = alert_type
+        self.market = market
+        self.active = False
+        self.level = -1
+        self.ev = 0.0
+        self.raised_at = None
+        self.cleared_at = None
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data):
+        entry = cls(data["key"], data["alert_type"], data["market"])
+        for name in cls.__slots__[3:]:
+            setattr(entry, name, data[name])
+        return entry
+
+
+def _tier(ev):
+    """Index of the highest escalation level ``ev`` exceeds, or -1"""
+    level = -1
+    for i, threshold in enumerate(ESCALATION_LEVELS):
+        if ev > threshold:
+            level = i
+    return level
+
+
+class AlertState:
+    """Alert state keyed by (market, alert type), optionally persisted"""
+
+    def __init__(self, state_file=None, raise_ev=RAISE_EV, clear_ev=CLEAR_EV, cooldown=COOLDOWN):
+        self.state_file = state_file
+        self.raise_ev = raise_ev
+        self.clear_ev = clear_ev
+        self.cooldown = cooldown
+        self.entries = {}
+        self.active = set()
+        self.suppressed = 0
+        self._load()
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        with open(self.state_file, 'r') as f:
+            for data in json.load(f):
+                entry = AlertEntry.from_dict(data)
+                key = (entry.key, entry.alert_type)
+                self.entries[key] = entry
+                if entry.active:
+                    self.active.add(key)
+
+    def save(self, now=None):
+        """Persist active alerts and keys still cooling down"""
+        if not self.state_file:
+            return
+        now = time.time() if now is None else now
+        self.entries = {
+            key: entry for key, entry in self.entries.items()
+            if entry.active or (entry.cleared_at is not None and now - entry.cleared_at < self.cooldown)
+        }
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump([entry.to_dict() for entry in self.entries.values()], f, separators=(',', ':'))
+        os.replace(tmp_file, self.state_file)
+
+    def _transition(self, entry, transition, ev, previous_ev=None):
+        if transition == 'raised':
+            severity = 'CRITICAL'
+            message = f"High EV opportunity found: {entry.market} (EV: {ev*100:.1f}%)"
+        elif transition == 'escalated':
+            severity = 'CRITICAL'
+            message = f"High EV opportunity widened: {entry.market} (EV: {previous_ev*100:.1f}% -> {ev*100:.1f}%)"
+        else:
+            severity = 'INFO'
+            message = f"High EV opportunity closed: {entry.market} (EV: {ev*100:.1f}%)"
+        return {
+            'type': entry.alert_type,
+            'transition': transition,
+            'key': entry.key,
+            'severity': severity,
+            'ev': ev,
+            'message': message,
+        }
+
+    def _clear(self, key, entry, ev, now):
+        entry.active = False
+        entry.level = -1
+        entry.cleared_at = now
+        self.active.discard(key)
+        return self._transition(entry, 'cleared', ev)
+
+    def update(self, scan_results, now=None, alert_type=HIGH_EV, complete=True):
+        """
+        Apply one tick of scan results and return the transitions
+
+        Results missing from this tick clear their active alerts, so callers
+        must pass the complete current candidate list. Pass complete=False
+        when part of the scan failed: results present still raise, escalate
+        and clear, but missing keys are left as they are.
+        """
+        now = time.time() if now is None else now
+        transitions = []
+        seen = set()
+
+        for result in scan_results:
+            ev = result.get('ev', 0)
+            key = (alert_key(result), alert_type)
+            seen.add(key)
+            entry = self.entries.get(key)
+
+            if entry is not None and entry.active:
+                if ev < self.clear_ev:
+                    transitions.append(self._clear(key, entry, ev, now))
+                    continue
+                tier = _tier(ev)
+                if tier > entry.level:
+                    transitions.append(self._transition(entry, 'escalated', ev, entry.ev))
+                    entry.level = tier
+                elif entry.level >= 0 and ev < ESCALATION_LEVELS[entry.level] - HYSTERESIS:
+                    entry.level = max(0, _tier(ev + HYSTERESIS))
+                entry.ev = ev
+                continue
+
+            if ev <= self.raise_ev:
+                continue
+            if entry is None:
+                entry = self.entries[key] = AlertEntry(key[0], alert_type, result['market'])
+            elif entry.cleared_at is not None and now - entry.cleared_at < self.cooldown:
+                self.suppressed += 1
+                continue
+            entry.market = result['market']
+            entry.active = True
+            entry.level = _tier(ev)
+            entry.ev = ev
+            entry.raised_at = now
+            self.active.add(key)
+            transitions.append(self._transition(entry, 'raised', ev))
+
+        if not complete:
+            return transitions
+        for key in [key for key in self.active if key[1] == alert_type and key not in seen]:
+            entry = self.entries[key]
+            transitions.append(self._clear(key, entry, entry.ev, now))
+
+        return transitions
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Backtest the heartbeat rules against recorded price history
+
+Recorded ticks from PriceHistory are replayed in time order through the
+live code paths: detect_arbitrage() for the YES+NO < threshold rule, then
+evaluate_alerts() with an AlertState for the EV threshold, hysteresis and
+cooldowns. Replay time is the recorded timestamps, so cooldowns behave as
+they did live. Detection runs as one set of numpy operations per tick
+over the memory-mapped columns.
+
+A tick may hold only the markets that changed since the previous one (the
+heartbeat records store deltas), so each market's last recorded row is
+carried forward until it changes or is recorded without prices (closed).
+
+Since arbitrage pays out at resolution, an alert's value depends on the
+edge still being there when we trade. Each raised alert is therefore
+checked against the next recorded tick: did the opportunity survive, and
+what edge and profit did it offer then.
+
+Parameter grids are spread across a process pool; each worker memory-maps
+the history itself.
+
+Limitations: history stores Gamma's top of book rather than book depth, so
+size is bounded by liquidity as in the live fallback. feesEnabled isn't
+recorded, so one fee_rate applies to every market. negRisk events are not
+replayed because event membership isn't recorded.
+
+Requires: pip install numpy
+"""
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from alert_state import CLEAR_EV, COOLDOWN, RAISE_EV, AlertState
+from arbitrage import ARB_THRESHOLD, FEE_RATE, GAS_PER_LEG, MarketArrays, detect_arbitrage
+from heartbeat_scanner import evaluate_alerts
+from price_history import HISTORY_DIR, PriceHistory
+
+FIELDS = ("market", "bestBid", "bestAsk", "outcomePrice0", "outcomePrice1", "liquidityNum")
+
+
+def iter_ticks(history, start=None, end=None):
+    """Yield (ts, columns) per recorded tick; rows of a tick are contiguous"""
+    columns = history.read(start=start, end=end, fields=FIELDS)
+    ts = columns["ts"]
+    if not len(ts):
+        return
+    bounds = np.flatnonzero(np.diff(ts)) + 1
+    for lo, hi in zip(np.r_[0, bounds], np.r_[bounds, len(ts)]):
+        yield float(ts[lo]), {name: column[lo:hi] for name, column in columns.items()}
+
+
+def _tick_arrays(rows, ids, fee_rate):
+    """MarketArrays for one tick, mirroring build_arrays()' Gamma top-of-book path"""
+    n = len(rows["market"])
+    arrays = MarketArrays()
+    arrays.ids = ids[rows["market"]].tolist()
+    arrays.questions = arrays.ids
+    best_ask = rows["bestAsk"].astype(np.float64)
+    best_bid = rows["bestBid"].astype(np.float64)
+    arrays.yes_ask = np.where(np.isnan(best_ask), rows["outcomePrice0"], best_ask)
+    arrays.no_ask = np.where(np.isnan(best_bid), rows["outcomePrice1"], 1.0 - best_bid)
+    arrays.yes_size = np.full(n, np.inf)
+    arrays.no_size = np.full(n, np.inf)
+    arrays.liquidity = np.nan_to_num(rows["liquidityNum"].astype(np.float64))
+    arrays.min_size = np.zeros(n)
+    arrays.fee_rate = np.full(n, fee_rate)
+    return arrays
+
+
+def run_backtest(root=HISTORY_DIR, threshold=ARB_THRESHOLD, raise_ev=RAISE_EV, clear_ev=None,
+                 cooldown=COOLDOWN, fee_rate=FEE_RATE, gas_per_leg=GAS_PER_LEG, start=None, end=None):
+    """
+    Replay history with one parameter set
+
+    Returns:
+        dict: the parameters plus detection, alert and next-tick statistics
+    """
+    if clear_ev is None:
+        clear_ev = raise_ev - (RAISE_EV - CLEAR_EV)
+    params = {'threshold': threshold, 'raise_ev': raise_ev, 'clear_ev': clear_ev, 'cooldown': cooldown,
+              'fee_rate': fee_rate, 'gas_per_leg': gas_per_leg}
+
+    history = PriceHistory(root)
+    ids = np.empty(len(history.slots), dtype=object)
+    for market_id, slot in history.slots.items():
+        ids[slot] = market_id
+
+    alerts = AlertState(raise_ev=raise_ev, clear_ev=clear_ev, cooldown=cooldown)
+    stats = {'ticks': 0, 'rows': 0, 'opportunities': 0, 'raised': 0, 'escalated': 0, 'cleared': 0}
+    raise_edges, next_edges, next_profits = [], [], []
+    pending = {}        # market_id -> edge when raised, awaiting the next tick
+    first_ts = last_ts = None
+
+    # Last recorded row per market slot, carried forward between ticks
+    latest = {name: np.full(len(ids), np.nan, dtype=np.float32) for name in FIELDS if name != "market"}
+    recorded = np.zeros(len(ids), dtype=bool)
+
+    started = time.perf_counter()
+    for ts, rows in iter_ticks(history, start, end):
+        for name, column in latest.items():
+            column[rows["market"]] = rows[name]
+        recorded[rows["market"]] = True
+        slots = np.flatnonzero(recorded)
+        arrays = _tick_arrays(dict({name: column[slots] for name, column in latest.items()}, market=slots),
+                              ids, fee_rate)
+        found = detect_arbitrage(arrays, threshold, gas_per_leg, max_results=len(arrays))
+        by_market = {result['market_id']: result for result in found}
+
+        # Execution check: what was left one tick after each raise
+        for market_id in pending:
+            result = by_market.get(market_id)
+            next_edges.append(result['edge'] if result else 0.0)
+            next_profits.append(result['profit'] if result else 0.0)
+        pending = {}
+
+        # Like the live scanner, alerting sees every opportunity, not just the top few
+        for alert in evaluate_alerts(found, alerts, now=ts):
+            stats[alert['transition']] += 1
+            if alert['transition'] == 'raised':
+                pending[alert['key']] = by_market[alert['key']]['edge']
+                raise_edges.append(pending[alert['key']])
+
+        stats['ticks'] += 1
+        stats['rows'] += len(arrays)
+        stats['opportunities'] += len(found)
+        first_ts = ts if first_ts is None else first_ts
+        last_ts = ts
+    elapsed = time.perf_counter() - started
+
+    survived = [edge > 0 for edge in next_edges]
+    span = (last_ts - first_ts) if stats['ticks'] > 1 else 0.0
+    return dict(params, **stats, **{
+        'seconds': round(elapsed, 3),
+        'speedup': round(span / elapsed, 1) if elapsed and span else None,
+        'mean_edge_at_raise': float(np.mean(raise_edges)) if raise_edges else None,
+        'survival_next_tick': float(np.mean(survived)) if survived else None,
+        'mean_edge_next_tick': float(np.mean(next_edges)) if next_edges else None,
+        'profit_next_tick': float(np.sum(next_profits)),
+    })
+
+
+def _run(kwargs):
+    return run_backtest(**kwargs)
+
+
+def sweep(grid, root=HISTORY_DIR, workers=None, **fixed):
+    """
+    Run every combination in ``grid`` (name -> list of values) on a process pool
+
+    Returns:
+        list of result dicts in grid order
+    """
+    names = list(grid)
+    jobs = [dict(fixed, root=root, **dict(zip(names, values)))
+            for values in itertools.product(*(grid[name] for name in names))]
+    if len(jobs) == 1:
+        return [_run(jobs[0])]
+    with ProcessPoolExecutor(max_workers=workers or min(len(jobs), os.cpu_count() or 1)) as pool:
+        return list(pool.map(_run, jobs))
+
+
+def _floats(value):
+    return [float(v) for v in value.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backtest heartbeat detection and alert rules")
+    parser.add_argument("--history", default=HISTORY_DIR, help="PriceHistory directory")
+    parser.add_argument("--threshold", type=_floats, default=[ARB_THRESHOLD], help="YES+NO thresholds, comma separated")
+    parser.add_argument("--raise-ev", type=_floats, default=[RAISE_EV], help="Alert EV thresholds, comma separated")
+    parser.add_argument("--gas", type=_floats, default=[GAS_PER_LEG], help="Gas per leg (USDC), comma separated")
+    parser.add_argument("--cooldown", type=float, default=COOLDOWN)
+    parser.add_argument("--start", type=float, help="Unix timestamp to start from")
+    parser.add_argument("--end", type=float, help="Unix timestamp to stop at")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--json", help="Write full results to this file")
+    args = parser.parse_args()
+
+    results = sweep(
+        {'threshold': args.threshold, 'raise_ev': args.raise_ev, 'gas_per_leg': args.gas},
+        root=args.history, workers=args.workers,
+        cooldown=args.cooldown, start=args.start, end=args.end,
+    )
+
+    print(f"{'threshold':>9} {'raise_ev':>8} {'gas':>5} {'opps':>7} {'raised':>6} "
+          f"{'survive':>7} {'edge@raise':>10} {'edge@next':>9} {'profit@next':>11} {'speedup':>8}")
+    for r in results:
+        def pct(value):
+            return f"{value*100:.2f}%" if value is not None else "-"
+        print(f"{r['threshold']:>9.3f} {r['raise_ev']:>8.2f} {r['gas_per_leg']:>5.2f} {r['opportunities']:>7} "
+              f"{r['raised']:>6} {pct(r['survival_next_tick']):>7} {pct(r['mean_edge_at_raise']):>10} "
+              f"{pct(r['mean_edge_next_tick']):>9} {r['profit_next_tick']:>11,.2f} {r['speedup'] or '-':>8}x")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Results written to {args.json}")
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo bankroll simulator
+
+Replays a sizing plan (market_analysis rows: side, price, probability and
+bankroll fraction per bet) over many rounds. Each round stakes the same
+fractions of the current bankroll and resolves every bet. Paths are
+simulated as batched numpy arrays (one (paths x bets) outcome matrix per
+round) and sharded across a process pool.
+
+Outcomes come from portfolio_kelly.scenario_matrix, so exclusive groups
+(negRisk siblings) and group correlations are respected.
+
+Reports ruin probability, the max-drawdown distribution and percentiles of
+the per-round log growth rate.
+
+Requires: pip install numpy
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from market_analysis import FEE_RATE, NO, YES
+from portfolio_kelly import bet_returns, scenario_matrix
+
+N_PATHS = 1_000_000
+N_ROUNDS = 100
+SHARD_SIZE = 250_000
+RUIN_LEVEL = 0.10             # bankroll at or below 10% of the start counts as ruin
+DRAWDOWN_LIMIT = 0.30         # max acceptable loss (risk_management.md)
+PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+PLAUSIBLE_MULTIPLE = 100.0    # final multiples above this are compounding artifacts, not forecasts
+
+
+def simulate_shard(side, price, prob_yes, fractions, n_paths, n_rounds, groups=None, corr=None,
+                   fee_rate=FEE_RATE, ruin_level=RUIN_LEVEL, seed=0):
+    """
+    Simulate one shard of paths
+
+    Returns:
+        dict of per-path arrays: final_log (log of final bankroll multiple),
+        max_drawdown, ruined
+    """
+    fractions = np.asarray(fractions, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    log_bankroll = np.zeros(n_paths)
+    peak = np.zeros(n_paths)
+    max_drawdown = np.zeros(n_paths)
+    ruined = np.zeros(n_paths, dtype=bool)
+    ruin_log = np.log(ruin_level)
+
+    for _ in range(n_rounds):
+        outcomes = scenario_matrix(prob_yes, groups, corr, n_paths, int(rng.integers(2**63)))
+        growth = 1.0 + bet_returns(outcomes, side, price, fee_rate) @ fractions
+        # Ruined paths stop betting
+        log_bankroll = np.where(ruined, log_bankroll, log_bankroll + np.log(np.maximum(growth, 1e-12)))
+        np.maximum(peak, log_bankroll, out=peak)
+        np.maximum(max_drawdown, 1.0 - np.exp(log_bankroll - peak), out=max_drawdown)
+        ruined |= log_bankroll <= ruin_log
+
+    return {'final_log': log_bankroll, 'max_drawdown': max_drawdown, 'ruined': ruined}
+
+
+def _run_shard(kwargs):
+    return simulate_shard(**kwargs)
+
+
+def simulate(side, price, prob_yes, fractions, n_paths=N_PATHS, n_rounds=N_ROUNDS, groups=None, corr=None,
+             fee_rate=FEE_RATE, ruin_level=RUIN_LEVEL, drawdown_limit=DRAWDOWN_LIMIT, workers=None,
+             shard_size=SHARD_SIZE, seed=0):
+    """
+    Simulate ``n_paths`` bankroll paths of ``n_rounds`` rounds across a process pool
+
+    ``fee_rate`` may be a scalar or one rate per bet.
+
+    Returns:
+        dict: ruin_probability, drawdown_breach_probability (max drawdown >=
+        drawdown_limit), drawdown and growth-rate percentiles, median growth
+        per round, median final multiple, elapsed seconds
+    """
+    started = time.perf_counter()
+    shards = [min(shard_size, n_paths - i) for i in range(0, n_paths, shard_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(shards))
+    jobs = [
+        dict(side=side, price=price, prob_yes=prob_yes, fractions=fractions, n_paths=size, n_rounds=n_rounds,
+             groups=groups, corr=corr, fee_rate=fee_rate, ruin_level=ruin_level,
+             seed=int(s.generate_state(1, dtype=np.uint64)[0]))
+        for size, s in zip(shards, seeds)
+    ]
+
+    workers = workers or min(len(jobs), os.cpu_count() or 1)
+    if workers == 1:
+        results = [_run_shard(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_shard, jobs))
+
+    final_log = np.concatenate([r['final_log'] for r in results])
+    max_drawdown = np.concatenate([r['max_drawdown'] for r in results])
+    ruined = np.concatenate([r['ruined'] for r in results])
+    growth_rate = final_log / n_rounds
+
+    return {
+        'paths': n_paths,
+        'rounds': n_rounds,
+        'ruin_probability': float(ruined.mean()),
+        'drawdown_breach_probability': float((max_drawdown >= drawdown_limit).mean()),
+        'max_drawdown_percentiles': dict(zip(PERCENTILES, np.percentile(max_drawdown, PERCENTILES).tolist())),
+        'growth_rate_percentiles': dict(zip(PERCENTILES, np.percentile(growth_rate, PERCENTILES).tolist())),
+        'median_round_growth': float(np.expm1(np.median(growth_rate))),
+        'median_final_multiple': float(np.exp(np.median(final_log))),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+def plan_from_rows(rows, joint=False):
+    """(bets, side, price, prob_yes, fractions, groups, fee_rate) from market_analysis rows with a stake"""
+    key = 'joint_fraction' if joint else 'fraction'
+    bets = [row for row in rows if row.get('source') is not None and row.get(key, 0) > 0]
+    side = np.array([YES if row['side'] == 'YES' else NO for row in bets])
+    price = np.array([row['price'] for row in bets])
+    prob_yes = np.array([row['prob'] if row['side'] == 'YES' else 1.0 - row['prob'] for row in bets])
+    fractions = np.array([row[key] for row in bets])
+    groups = [row.get('group') for row in bets]
+    fee_rate = np.array([row.get('fee_rate', FEE_RATE) for row in bets])
+    return bets, side, price, prob_yes, fractions, groups, fee_rate
+
+
+if __name__ == "__main__":
+    from market_analysis import ESTIMATES_FILE, QUARTER_KELLY, add_joint_sizing, analyze, load_estimates
+    from market_model import Market
+    from market_search import MarketSearchIndex
+    from market_store import MarketStore
+
+    parser = argparse.ArgumentParser(description="Monte Carlo bankroll simulation of a sizing plan")
+    parser.add_argument("--rows", help="market_analysis --json output (otherwise analyze the estimates)")
+    parser.add_argument("--estimates", default=ESTIMATES_FILE)
+    parser.add_argument("--kelly", type=float, default=QUARTER_KELLY, help="Kelly multiplier")
+    parser.add_argument("--joint", action="store_true", help="Use joint (portfolio) fractions")
+    parser.add_argument("--paths", type=int, default=N_PATHS)
+    parser.add_argument("--rounds", type=int, default=N_ROUNDS)
+    parser.add_argument("--ruin", type=float, default=RUIN_LEVEL, help="Ruin level as a fraction of the start")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if args.rows:
+        with open(args.rows, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+    else:
+        store = MarketStore()
+        records = [Market.from_gamma(raw) for raw in store.markets.values()]
+        rows = analyze(load_estimates(args.estimates), records, kelly_multiplier=args.kelly,
+                       index=MarketSearchIndex().attach(store))
+    if args.joint and not any('joint_fraction' in row for row in rows):
+        add_joint_sizing(rows, args.kelly)
+
+    bets, side, price, prob_yes, fractions, groups, fee_rate = plan_from_rows(rows, args.joint)
+    if not bets:
+        print("No sized bets to simulate")
+        sys.exit(1)
+
+    report = simulate(side, price, prob_yes, fractions, args.paths, args.rounds, groups,
+                      fee_rate=fee_rate, ruin_level=args.ruin, workers=args.workers)
+
+    print(f"✅ {report['paths']:,} paths x {report['rounds']} rounds, {len(bets)} bets "
+          f"({fractions.sum():.1%} of bankroll per round) in {report['seconds']}s")
+    print(f"   Ruin (<= {args.ruin:.0%} of start): {report['ruin_probability']:.4%}")
+    print(f"   Max drawdown >= {DRAWDOWN_LIMIT:.0%}: {report['drawdown_breach_probability']:.2%}")
+    print("   Max drawdown  " + "  ".join(f"p{p}: {v:.1%}" for p, v in report['max_drawdown_percentiles'].items()))
+    print("   Growth/round  " + "  ".join(f"p{p}: {v:+.3f}" for p, v in report['growth_rate_percentiles'].items()))
+    print(f"   Median growth/round: {report['median_round_growth']:+.2%}")
+    if report['median_final_multiple'] > PLAUSIBLE_MULTIPLE:
+        print(f"   ⚠️ Median final bankroll {report['median_final_multiple']:.3g}x is not a forecast: it assumes "
+              f"every edge holds for all {report['rounds']} rounds at unchanged prices")
+    else:
+        print(f"   Median final bankroll: {report['median_final_multiple']:.4g}x")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Multi-outcome (negRisk) event arbitrage
+
+In a negRisk event exactly one sibling market resolves YES, so the YES
+prices across the event should sum to 1:
+  - sum(YES asks) < 1 - fees  -> buy every YES, one of them pays $1
+  - sum(YES bids) > 1 + fees  -> buy every NO (NO ask = 1 - YES bid),
+                                 all but one of them pay $1
+
+EventIndex groups markets by event and keeps running per-event sums of
+best asks / bids as single markets change. Only events touched since the
+last call are re-evaluated, so a tick costs O(changed markets).
+
+Asks and bids are tracked separately: a leg without a bid still allows
+BUY_ALL_YES, and a leg without an ask still allows BUY_ALL_NO. Size is
+bounded by the thinnest leg's liquidity and gas is charged per leg, as in
+arbitrage.detect_arbitrage.
+
+Caveat: an event is only evaluated on the markets we hold. If a sibling is
+missing from the store, the sums understate the true total.
+"""
+import math
+
+FEE_RATE = 0.02          # Fee on each winning leg's profit
+GAS_PER_LEG = 0.01       # USDC per order
+MIN_EDGE = 0.005         # Ignore sub-half-cent edges
+MIN_LEGS = 2
+
+
+class EventGroup:
+    """Live aggregates for one event"""
+
+    __slots__ = ("event_id", "title", "members", "ask_sum", "bid_sum", "missing_asks", "missing_bids")
+
+    def __init__(self, event_id, title):
+        self.event_id = event_id
+        self.title = title
+        self.members = {}       # market_id -> (best_ask, best_bid, liquidity)
+        self.ask_sum = 0.0
+        self.bid_sum = 0.0
+        self.missing_asks = 0   # members without a usable ask
+        self.missing_bids = 0   # members without a usable bid
+
+    def put(self, market_id, ask, bid, liquidity=0.0):
+        self.drop(market_id)
+        self.members[market_id] = (ask, bid, liquidity)
+        if math.isnan(ask):
+            self.missing_asks += 1
+        else:
+            self.ask_sum += ask
+        if math.isnan(bid):
+            self.missing_bids += 1
+        else:
+            self.bid_sum += bid
+
+    def drop(self, market_id):
+        old = self.members.pop(market_id, None)
+        if old is None:
+            return
+        if math.isnan(old[0]):
+            self.missing_asks -= 1
+        else:
+            self.ask_sum -= old[0]
+        if math.isnan(old[1]):
+            self.missing_bids -= 1
+        else:
+            self.bid_sum -= old[1]
+
+    def resum(self):
+        """Exact recomputation to shed accumulated float error"""
+        asks = [v[0] for v in self.members.values() if not math.isnan(v[0])]
+        bids = [v[1] for v in self.members.values() if not math.isnan(v[1])]
+        self.ask_sum = math.fsum(asks)
+        self.bid_sum = math.fsum(bids)
+        self.missing_asks = len(self.members) - len(asks)
+        self.missing_bids = len(self.members) - len(bids)
+
+
+class EventIndex:
+    """negRisk events keyed by event id, updated one market at a time"""
+
+    def __init__(self, fee_rate=FEE_RATE, gas_per_leg=GAS_PER_LEG, min_edge=MIN_EDGE):
+        self.fee_rate = fee_rate
+        self.gas_per_leg = gas_per_leg
+        self.min_edge = min_edge
+        self.groups = {}
+        self.market_event = {}
+        self.opportunities = {}
+        self._dirty = set()
+
+    def update(self, market):
+        """Apply one Market record (new, repriced, or closed)"""
+        if market.closed or not market.neg_risk or market.event_id is None:
+            self.remove(market.id)
+            return
+
+        previous = self.market_event.get(market.id)
+        if previous is not None and previous != market.event_id:
+            self.remove(market.id)
+
+        group = self.groups.get(market.event_id)
+        if group is None:
+            group = self.groups[market.event_id] = EventGroup(market.event_id, market.event_title)
+        group.put(market.id, market.best_ask, market.best_bid, market.liquidity)
+        self.market_event[market.id] = market.event_id
+        self._dirty.add(market.event_id)
+
+    def remove(self, market_id):
+        event_id = self.market_event.pop(market_id, None)
+        if event_id is None:
+            return
+        group = self.groups[event_id]
+        group.drop(market_id)
+        if group.members:
+            group.resum()
+            self._dirty.add(event_id)
+        else:
+            del self.groups[event_id]
+            self.opportunities.pop(event_id, None)
+            self._dirty.discard(event_id)
+
+    def _side(self, side, edge, cost, prices, liquidity, gas):
+        """(profit, side, edge, cost, size) for one side, or None if it doesn't pay"""
+        if edge < self.min_edge or cost <= 0 or min(prices) <= 0:
+            return None
+        # Share sets: each leg's liquidity buys liquidity / price of its shares
+        size = min(l / p for l, p in zip(liquidity, prices))
+        profit = edge * size - gas
+        if profit <= 0:
+            return None
+        return profit, side, edge, cost, size
+
+    def _evaluate(self, group):
+        """Best arbitrage on one event, or None"""
+        legs = len(group.members)
+        if legs < MIN_LEGS:
+            return None
+
+        asks = [v[0] for v in group.members.values()]
+        bids = [v[1] for v in group.members.values()]
+        liquidity = [v[2] for v in group.members.values()]
+        gas = legs * self.gas_per_leg
+        sides = []
+
+        if not group.missing_asks:
+            # Buy all YES: the winner's profit is taxed; worst case is the cheapest leg
+            yes_edge = 1.0 - group.ask_sum - self.fee_rate * (1.0 - min(asks))
+            sides.append(self._side('BUY_ALL_YES', yes_edge, group.ask_sum, asks, liquidity, gas))
+        if not group.missing_bids:
+            # Buy all NO: legs-1 winners; worst case is the loser with the lowest bid
+            no_cost = legs - group.bid_sum
+            no_edge = (legs - 1) - no_cost - self.fee_rate * (group.bid_sum - min(bids))
+            sides.append(self._side('BUY_ALL_NO', no_edge, no_cost, [1.0 - b for b in bids], liquidity, gas))
+
+        sides = [s for s in sides if s is not None]
+        if not sides:
+            return None
+        profit, side, edge, cost, size = max(sides)
+
+        return {
+            'type': 'NEG_RISK_ARBITRAGE',
+            'event_id': group.event_id,
+            'market': group.title,
+            'side': side,
+            'legs': legs,
+            'ask_sum': group.ask_sum,
+            'bid_sum': group.bid_sum,
+            'cost': cost,
+            'edge': edge,
+            'size': size,
+            'gas': gas,
+            'profit': profit,
+            'ev': edge / cost,
+        }
+
+    def candidates(self):
+        """
+        Re-evaluate events changed since the last call and return every
+        currently open opportunity, largest expected profit first
+        """
+        for event_id in self._dirty:
+            group = self.groups.get(event_id)
+            opportunity = self._evaluate(group) if group is not None else None
+            if opportunity is None:
+                self.opportunities.pop(event_id, None)
+            else:
+                self.opportunities[event_id] = opportunity
+        self._dirty.clear()
+        return sorted(self.opportunities.values(), key=lambda o: o['profit'], reverse=True)
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from market_model import Market
+
+    snapshot = sys.argv[1] if len(sys.argv) > 1 else "/root/openclaw_data/lin/data/market_store.json"
+    with open(snapshot, 'r') as f:
+        data = json.load(f)
+    raw_markets = data["markets"] if isinstance(data, dict) else data
+
+    index = EventIndex()
+    for raw in raw_markets:
+        index.update(Market.from_gamma(raw))
+    found = index.candidates()
+    print(f"✅ {len(index.groups)} negRisk events, {len(found)} opportunities")
+    for opp in found[:10]:
+        print(f"   {opp['market']}: {opp['side']} x{opp['legs']} edge {opp['edge']*100:.2f}% profit ${opp['profit']:.2f}")
@@ -2,15 +2,106 @@
 """
 Fetch trending markets from Polymarket for analysis
 """
-import requests
+import argparse
 import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from datetime import datetime
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_session import get_session
+from rate_limiter import PRIORITY_CRAWL
+from market_model import loads_markets
+
+GAMMA_API_URL = os.getenv("GAMMA_API_URL", "https://gamma-api.polymarket.com")
+GAMMA_MARKETS_URL = f"{GAMMA_API_URL}/markets"
+
+# Full-universe crawl settings
+PAGE_SIZE = 100
+MAX_WORKERS = 8
+
+
+def _fetch_page(session, params, offset, limit, as_records=False, priority=PRIORITY_CRAWL):
+    """Fetch one offset/limit page of markets (dicts or Market records)"""
+    page_params = dict(params, offset=offset, limit=limit)
+    loads = loads_markets if as_records else json.loads
+    return session.get_json(GAMMA_MARKETS_URL, params=page_params, timeout=10, loads=loads,
+                            endpoint="gamma:markets", priority=priority)
+
+
+def iter_markets(page_size=PAGE_SIZE, max_workers=MAX_WORKERS, as_records=False,
+                 priority=PRIORITY_CRAWL, **filters):
+    """
+    Stream every active market by walking all offset/limit pages
+
+    Up to ``max_workers`` pages are in flight at once. Markets are yielded
+    as soon as their page arrives, so page order is not preserved. The crawl
+    stops dispatching once a short page marks the end of the universe.
+
+    Args:
+        page_size: Markets per request
+        max_workers: Maximum concurrent page requests
+        as_records: Yield slotted Market records instead of raw dicts
+        priority: Rate-limit priority class (see rate_limiter)
+        **filters: Extra Gamma query params (e.g. order="volume24hr")
+    """
+    params = {"active": "true", "closed": "false", **filters}
+    session = get_session()
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    pending = {}
+    next_offset = 0
+    end_reached = False
+
+    def submit():
+        nonlocal next_offset
+        future = pool.submit(_fetch_page, session, params, next_offset, page_size, as_records, priority)
+        pending[future] = next_offset
+        next_offset += page_size
+
+    try:
+        for _ in range(max_workers):
+            submit()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                page = future.result()
+                if len(page) < page_size:
+                    end_reached = True
+                yield from page
+
+            while not end_reached and len(pending) < max_workers:
+                submit()
+    finally:
+        # Consumer stopped early or a page failed: drop queued pages
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_all_markets():
+    """Crawl the full active universe and report throughput"""
+    started = time.monotonic()
+    count = 0
+
+    try:
+        for _ in iter_markets(as_records=True):
+            count += 1
+    except Exception as e:
+        print(f"Error: {e}")
+        return None
+
+    elapsed = time.monotonic() - started
+    print(f"✅ Fetched {count} active markets in {elapsed:.2f}s")
+    return count
+
+
 def fetch_markets():
     """Fetch active markets from Polymarket"""
     
     # Polymarket public API endpoint
-    url = "https://gamma-api.polymarket.com/markets"
+    url = GAMMA_MARKETS_URL
     
     params = {
         "limit": 50,
@@ -20,9 +111,7 @@ def fetch_markets():
     }
     
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        markets = response.json()
+        markets = get_session().get_json(url, params=params, timeout=10, endpoint="gamma:markets")
         
         print("=== Top 20 Active Markets by Volume ===\n")
         
@@ -52,15 +141,26 @@ def fetch_markets():
             
             print()
         
-        # Save to file for later analysis
-        with open('/root/openclaw_data/lin/data/markets_snapshot.json', 'w') as f:
-            json.dump(markets[:20], f, indent=2)
+        # Append price fields to the columnar history for later analysis
+        from price_history import PriceHistory
+        rows = PriceHistory().append(markets)
         
-        print("✅ Data saved to data/markets_snapshot.json")
+        print(f"✅ {rows} rows appended to data/price_history/")
         
     except Exception as e:
         print(f"Error: {e}")
         return None
 
 if __name__ == "__main__":
-    fetch_markets()
+    parser = argparse.ArgumentParser(description="Fetch Polymarket markets")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Crawl every active market page concurrently"
+    )
+    args = parser.parse_args()
+
+    if args.all:
+        fetch_all_markets()
+    else:
+        fetch_markets()
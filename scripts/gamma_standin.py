@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Gamma / CLOB stand-in server for offline load tests and benchmarks
+
+  serve   Replay recorded markets over HTTP (pagination, latency, 429s, drift)
+  record  Capture a real Gamma session (+ CLOB books) into a fixture file
+  bench   Start a stand-in in-process and measure fetch/sync throughput
+
+Point the scripts at a stand-in with:
+  GAMMA_API_URL=http://127.0.0.1:8765 CLOB_API_URL=http://127.0.0.1:8765
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DATA_DIR = "/root/openclaw_data/lin/data"
+DEFAULT_FIXTURE = f"{DATA_DIR}/markets_snapshot.json"
+
+
+def load_fixture(path):
+    """
+    Load recorded markets
+
+    Accepts either the markets_snapshot.json shape (a list of Gamma markets)
+    or a recorder fixture ({"markets": [...], "books": {token_id: book}}).
+    """
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return data, {}
+    return data.get("markets", []), data.get("books", {})
+
+
+def replicate(markets, count):
+    """Clone fixture markets with unique ids/tokens up to ``count`` markets"""
+    if count <= len(markets):
+        return markets
+    result = list(markets)
+    n = 0
+    while len(result) < count:
+        source = markets[n % len(markets)]
+        clone = dict(source)
+        suffix = f"-r{n}"
+        clone["id"] = f"{source['id']}{suffix}"
+        if source.get("conditionId"):
+            clone["conditionId"] = f"{source['conditionId']}{suffix}"
+        tokens = source.get("clobTokenIds")
+        if isinstance(tokens, str):
+            tokens = json.loads(tokens)
+        if tokens:
+            clone["clobTokenIds"] = json.dumps([f"{t}{suffix}" for t in tokens])
+        result.append(clone)
+        n += 1
+    return result
+
+
+def _now_iso():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class StandinState:
+    """Mutable market universe plus the fault/latency knobs"""
+
+    def __init__(self, markets, books=None, latency_ms=0.0, jitter_ms=0.0,
+                 rate_limit=0.0, retry_after=1.0, drift=0.0, seed=0):
+        self.markets = markets
+        self.books = books or {}
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.drift = drift
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.requests = 0
+        self.throttled = 0
+        self._tokens = rate_limit
+        self._last_refill = time.monotonic()
+        self._last_drift = time.monotonic()
+        self._tokens_index = None
+
+    def admit(self):
+        """Global token bucket; False means answer 429"""
+        with self.lock:
+            self.requests += 1
+            if self.rate_limit <= 0:
+                return True
+            now = time.monotonic()
+            self._tokens = min(self.rate_limit, self._tokens + (now - self._last_refill) * self.rate_limit)
+            self._last_refill = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.throttled += 1
+            return False
+
+    def sleep(self):
+        delay = self.latency_ms + self.random.uniform(0, self.jitter_ms) if self.jitter_ms else self.latency_ms
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def apply_drift(self):
+        """Random-walk a share of prices, proportional to elapsed time"""
+        if self.drift <= 0:
+            return
+        with self.lock:
+            now = time.monotonic()
+            elapsed = now - self._last_drift
+            if elapsed < 0.05:
+                return
+            self._last_drift = now
+            touched = max(1, int(len(self.markets) * min(1.0, elapsed)))
+            stamp = _now_iso()
+            for market in self.random.sample(self.markets, min(touched, len(self.markets))):
+                self._drift_market(market, self.drift * elapsed ** 0.5, stamp)
+            self.generation += 1
+
+    def _drift_market(self, market, sigma, stamp):
+        prices = market.get("outcomePrices")
+        if isinstance(prices, str):
+            prices = json.loads(prices)
+        if not prices:
+            self._drift_top_of_book(market, sigma, stamp)
+            return
+        yes = min(0.999, max(0.001, float(prices[0]) + self.random.gauss(0, sigma)))
+        market["outcomePrices"] = json.dumps([f"{yes:.4f}", f"{1 - yes:.4f}"])
+        half_spread = max(0.005, float(market.get("spread") or 0.01) / 2)
+        market["bestBid"] = round(max(0.001, yes - half_spread), 4)
+        market["bestAsk"] = round(min(0.999, yes + half_spread), 4)
+        market["lastTradePrice"] = round(yes, 4)
+        market["updatedAt"] = stamp
+
+    def _drift_top_of_book(self, market, sigma, stamp):
+        """Fallback for fixtures without outcomePrices: shift bid/ask/last together"""
+        fields = [field for field in ("bestBid", "bestAsk", "lastTradePrice") if market.get(field) is not None]
+        if not fields:
+            return
+        step = self.random.gauss(0, sigma)
+        for field in fields:
+            market[field] = round(min(0.999, max(0.001, float(market[field]) + step)), 4)
+        market["updatedAt"] = stamp
+
+    def query_markets(self, query):
+        """Apply Gamma-style filters, ordering and offset/limit"""
+        markets = self.markets
+        if query.get("closed") == "false":
+            markets = [m for m in markets if not m.get("closed")]
+        if query.get("active") == "true":
+            markets = [m for m in markets if m.get("active", True)]
+        order = query.get("order")
+        if order:
+            descending = query.get("ascending", "false") != "true"
+            markets = sorted(markets, key=lambda m: _sort_key(m.get(order)), reverse=descending)
+        offset = int(query.get("offset", 0))
+        limit = int(query.get("limit", 100))
+        return markets[offset:offset + limit]
+
+    def book_for(self, token_id):
+        """Recorded book if present, otherwise synthesized around bestBid/bestAsk"""
+        if token_id in self.books:
+            return self.books[token_id]
+        if self._tokens_index is None:
+            self._tokens_index = {}
+            for market in self.markets:
+                tokens = market.get("clobTokenIds")
+                if isinstance(tokens, str):
+                    tokens = json.loads(tokens)
+                for outcome, token in enumerate(tokens or []):
+                    self._tokens_index[token] = (market, outcome)
+        entry = self._tokens_index.get(token_id)
+        if entry is None:
+            return None
+        return _synth_book(entry[0], token_id, entry[1])
+
+
+def _sort_key(value):
+    if isinstance(value, (int, float)):
+        return (0, value, "")
+    try:
+        return (0, float(value), "")
+    except (TypeError, ValueError):
+        return (1, 0.0, str(value or ""))
+
+
+def _synth_book(market, token_id, outcome):
+    """Five levels per side around the market's top of book"""
+    bid = float(market.get("bestBid") or 0.49)
+    ask = float(market.get("bestAsk") or 0.51)
+    if outcome == 1:
+        bid, ask = 1 - ask, 1 - bid
+    tick = float(market.get("orderPriceMinTickSize") or 0.01)
+    bids = [{"price": f"{max(tick, bid - i * tick):.4f}", "size": f"{100 * (i + 1)}"} for i in range(5)]
+    asks = [{"price": f"{min(1 - tick, ask + i * tick):.4f}", "size": f"{100 * (i + 1)}"} for i in range(5)]
+    return {
+        "market": market.get("conditionId"),
+        "asset_id": token_id,
+        "timestamp": str(int(time.time() * 1000)),
+        "bids": bids[::-1],
+        "asks": asks[::-1],
+    }
+
+
+def make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload, headers=None):
+            body = json.dumps(payload, separators=(',', ':')).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _preamble(self):
+            state.sleep()
+            if not state.admit():
+                self._send_json(429, {"error": "rate limited"}, {"Retry-After": str(state.retry_after)})
+                return False
+            state.apply_drift()
+            return True
+
+        def do_GET(self):
+            if not self._preamble():
+                return
+            url = urlparse(self.path)
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+            if url.path == "/markets":
+                etag = '"' + hashlib.md5(f"{state.generation}:{url.query}".encode()).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self._send_json(200, state.query_markets(query), {"ETag": etag})
+            elif url.path == "/book":
+                book = state.book_for(query.get("token_id", ""))
+                if book is None:
+                    self._send_json(404, {"error": "No orderbook exists for the requested token id"})
+                else:
+                    self._send_json(200, book)
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"[]")
+            if not self._preamble():
+                return
+            if urlparse(self.path).path == "/books":
+                books = [state.book_for(item.get("token_id", "")) for item in payload]
+                self._send_json(200, [book for book in books if book is not None])
+            else:
+                self._send_json(404, {"error": "not found"})
+
+    return Handler
+
+
+def start_server(state, host="127.0.0.1", port=0):
+    """Start a stand-in in a daemon thread; returns (server, base_url)"""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def record(out_path, pages, page_size, with_books):
+    """Capture live Gamma pages (and optionally CLOB books) into a fixture"""
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from http_session import get_session
+
+    session = get_session()
+    gamma_url = os.getenv("GAMMA_API_URL", "https://gamma-api.polymarket.com")
+    clob_url = os.getenv("CLOB_API_URL", "https://clob.polymarket.com")
+
+    markets = []
+    for page in range(pages):
+        params = {"active": "true", "closed": "false", "order": "volume24hr",
+                  "limit": page_size, "offset": page * page_size}
+        batch = session.get_json(f"{gamma_url}/markets", params=params, conditional=False)
+        markets.extend(batch)
+        if len(batch) < page_size:
+            break
+
+    books = {}
+    if with_books:
+        token_ids = []
+        for market in markets:
+            tokens = market.get("clobTokenIds")
+            token_ids.extend(json.loads(tokens) if isinstance(tokens, str) else tokens or [])
+        for i in range(0, len(token_ids), 100):
+            chunk = [{"token_id": t} for t in token_ids[i:i + 100]]
+            response = session.post(f"{clob_url}/books", json=chunk, timeout=10)
+            response.raise_for_status()
+            for book in response.json():
+                books[book["asset_id"]] = book
+
+    with open(out_path, 'w') as f:
+        json.dump({"recorded_at": _now_iso(), "markets": markets, "books": books}, f, separators=(',', ':'))
+    print(f"✅ Recorded {len(markets)} markets, {len(books)} books -> {out_path}")
+
+
+def bench(state, rounds):
+    """Measure full crawl and delta-sync throughput against an in-process stand-in"""
+    server, base_url = start_server(state)
+    os.environ["GAMMA_API_URL"] = base_url
+    os.environ["CLOB_API_URL"] = base_url
+
+    import fetch_markets
+    fetch_markets.GAMMA_MARKETS_URL = f"{base_url}/markets"
+    from market_store import MarketStore
+
+    print(f"Stand-in: {base_url} | markets: {len(state.markets)}")
+    crawl_times = []
+    for _ in range(rounds):
+        started = time.monotonic()
+        count = sum(1 for _ in fetch_markets.iter_markets(as_records=True))
+        crawl_times.append(time.monotonic() - started)
+    best = min(crawl_times)
+    print(f"Full crawl:  {count} markets | best {best:.3f}s | {count / best:,.0f} markets/s")
+
+    store = MarketStore(store_file=os.path.join(tempfile.mkdtemp(), "store.json"))
+    store.sync()
+    sync_times = []
+    updated = 0
+    for _ in range(rounds):
+        if state.drift > 0:
+            # Give the drift clock time to move prices between delta syncs
+            time.sleep(0.1)
+        started = time.monotonic()
+        stats = store.sync()
+        sync_times.append(time.monotonic() - started)
+        updated += stats["updated"]
+    print(f"Delta sync:  best {min(sync_times):.3f}s | last {json.dumps(stats)} | updated {updated} total")
+    if state.drift > 0:
+        assert updated > 0, "delta sync saw no drifted markets; the benchmark measured nothing"
+    print(f"Server: {state.requests} requests, {state.throttled} throttled")
+    print(f"Client queue wait: {json.dumps(fetch_markets.get_session().scheduler.report()['gamma:markets'])}")
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gamma/CLOB stand-in server")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("serve", "bench"):
+        p = sub.add_parser(name)
+        p.add_argument("--fixture", default=DEFAULT_FIXTURE, help="Recorded markets JSON")
+        p.add_argument("--markets", type=int, default=0, help="Replicate fixture up to N markets")
+        p.add_argument("--latency-ms", type=float, default=0.0, help="Fixed per-request latency")
+        p.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random latency")
+        p.add_argument("--rate-limit", type=float, default=0.0, help="Requests/sec before 429 (0 = off)")
+        p.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429")
+        p.add_argument("--drift", type=float, default=0.0, help="Price drift sigma per sqrt(second)")
+        p.add_argument("--seed", type=int, default=0)
+    sub.choices["serve"].add_argument("--host", default="127.0.0.1")
+    sub.choices["serve"].add_argument("--port", type=int, default=8765)
+    sub.choices["bench"].add_argument("--rounds", type=int, default=5)
+
+    rec = sub.add_parser("record")
+    rec.add_argument("--out", default=f"{DATA_DIR}/gamma_fixture.json")
+    rec.add_argument("--pages", type=int, default=10)
+    rec.add_argument("--page-size", type=int, default=100)
+    rec.add_argument("--books", action="store_true", help="Also record CLOB order books")
+
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.out, args.pages, args.page_size, args.books)
+        return
+
+    markets, books = load_fixture(args.fixture)
+    if args.markets:
+        markets = replicate(markets, args.markets)
+    state = StandinState(markets, books, args.latency_ms, args.jitter_ms,
+                         args.rate_limit, args.retry_after, args.drift, args.seed)
+
+    if args.command == "bench":
+        bench(state, args.rounds)
+        return
+
+    server, base_url = start_server(state, args.host, args.port)
+    print(f"Stand-in serving {len(markets)} markets on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
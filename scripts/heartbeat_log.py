@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Buffered structured heartbeat log
+
+Records are buffered in memory and written as JSONL by a background thread,
+so log calls on the scan path cost a list append. The file rotates by size
+and age. HEARTBEAT_LOG.md is no longer appended to; `render` writes the
+recent entries into a marked section of it on demand, leaving the manual
+notes around that section untouched.
+"""
+import argparse
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+LIN_BRAIN = "/root/openclaw_data/lin/Lin_Brain"
+JSONL_FILE = f"{LIN_BRAIN}/heartbeat.jsonl"
+MARKDOWN_FILE = f"{LIN_BRAIN}/HEARTBEAT_LOG.md"
+
+FLUSH_INTERVAL = 1.0              # seconds between background flushes
+MAX_BUFFERED = 1000               # flush early once this many records wait
+MAX_BYTES = 10 * 1024 * 1024      # rotate when the live file exceeds this
+ROTATE_INTERVAL = 24 * 60 * 60    # ... or when it is older than this
+BACKUP_COUNT = 7
+
+RENDER_START = "<!-- heartbeat-log:start -->"
+RENDER_END = "<!-- heartbeat-log:end -->"
+RENDER_LIMIT = 200
+
+
+class HeartbeatLogger:
+    """JSONL logger with background flushing and size/time rotation"""
+
+    def __init__(self, path=JSONL_FILE, flush_interval=FLUSH_INTERVAL, max_bytes=MAX_BYTES,
+                 rotate_interval=ROTATE_INTERVAL, backup_count=BACKUP_COUNT):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.rotate_interval = rotate_interval
+        self.backup_count = backup_count
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._opened_at = None
+        self._file = None
+
+        self._thread = threading.Thread(target=self._run, name="heartbeat-log", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def log(self, level, message, **fields):
+        """Queue one record; never touches the disk on the caller's thread"""
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "level": level, "msg": message}
+        if fields:
+            record.update(fields)
+        with self._lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= MAX_BUFFERED:
+                self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if self._opened_at is None:
+            self._opened_at = self._started_at()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def _started_at(self):
+        """
+        When the live file was started: its first record's timestamp
+
+        Cron runs live for seconds, so age must come from the file itself,
+        not from when this process opened it.
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                first = f.readline()
+            return datetime.fromisoformat(json.loads(first)["ts"]).timestamp()
+        except FileNotFoundError:
+            return time.time()
+        except (ValueError, KeyError, TypeError):
+            return os.stat(self.path).st_mtime
+
+    def _should_rotate(self):
+        if self._file is None:
+            return False
+        too_big = self._file.tell() >= self.max_bytes
+        too_old = time.time() - self._opened_at >= self.rotate_interval
+        return too_big or too_old
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._opened_at = time.time()
+
+    def flush(self):
+        """Write everything buffered so far in one write call"""
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if not records:
+            return
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+        with self._write_lock:
+            if self._file is None:
+                self._open()
+            self._file.write(payload)
+            self._file.flush()
+            if self._should_rotate():
+                self._rotate()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=2)
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_records(path=JSONL_FILE, limit=None):
+    """
+    Most recent records from the live file and its backups, oldest first
+
+    Files are read newest-first and reading stops once ``limit`` is reached.
+    """
+    backups = sorted(
+        (p for p in glob.glob(f"{path}.*") if p.rsplit(".", 1)[1].isdigit()),
+        key=lambda p: int(p.rsplit(".", 1)[1]),
+    )
+    records = []
+    for file_path in [path] + backups:
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = [line for line in f.read().splitlines() if line.strip()]
+        records = [json.loads(line) for line in lines] + records
+        if limit and len(records) >= limit:
+            break
+    return records[-limit:] if limit else records
+
+
+def render_markdown(path=JSONL_FILE, markdown_path=MARKDOWN_FILE, limit=RENDER_LIMIT):
+    """Rewrite the marked log section of HEARTBEAT_LOG.md from the JSONL log"""
+    lines = []
+    for record in read_records(path, limit):
+        stamp = record["ts"].replace("T", " ")[:19]
+        lines.append(f"[{stamp}] [{record['level']}] {record['msg']}")
+    section = f"{RENDER_START}\n```\n" + "\n".join(lines) + f"\n```\n{RENDER_END}"
+
+    document = ""
+    if os.path.exists(markdown_path):
+        with open(markdown_path, 'r', encoding='utf-8') as f:
+            document = f.read()
+
+    if RENDER_START in document and RENDER_END in document:
+        head = document[:document.index(RENDER_START)]
+        tail = document[document.index(RENDER_END) + len(RENDER_END):]
+        document = head + section + tail
+    else:
+        document = document.rstrip("\n") + "\n\n## 自動スキャンログ\n\n" + section + "\n"
+
+    with open(markdown_path, 'w', encoding='utf-8') as f:
+        f.write(document)
+    return len(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Heartbeat log tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    render = sub.add_parser("render", help="Render recent JSONL entries into HEARTBEAT_LOG.md")
+    render.add_argument("--limit", type=int, default=RENDER_LIMIT)
+    render.add_argument("--jsonl", default=JSONL_FILE)
+    render.add_argument("--markdown", default=MARKDOWN_FILE)
+    args = parser.parse_args()
+
+    count = render_markdown(args.jsonl, args.markdown, args.limit)
+    print(f"✅ Rendered {count} entries into {args.markdown}")
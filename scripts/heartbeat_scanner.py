@@ -7,28 +7,89 @@ HeartBeat Scanner - 自律型市場スキャナー
 
 import os
 import sys
+import argparse
+import asyncio
+import signal
+import threading
+import time
 from datetime import datetime
+from functools import partial
 import json
 
+from alert_state import AlertState
+from arbitrage import build_arrays, detect_arbitrage
+from event_index import EventIndex
+from heartbeat_log import HeartbeatLogger, render_markdown
+from market_model import Market
+from market_store import MarketStore
+from orderbook import fetch_books, market_token_ids
+from position_book import PositionBook
+from price_history import PriceHistory
+from resolution_watch import ResolutionWatch
+from scan_scheduler import ScanScheduler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_session import get_session
+from metrics import registry
+from rate_limiter import PRIORITY_POSITIONS, PRIORITY_SCAN
+
 # Lin_Brainパス
 LIN_BRAIN = "/root/openclaw_data/lin/Lin_Brain"
 
+# アラート状態（重複抑止・クールダウン）の保存先：cron実行間でも状態を引き継ぐ
+ALERT_STATE_FILE = "/root/openclaw_data/lin/data/alert_state.json"
+
+# 解決日時チェックポイントの保存先：cron実行ごとに同じ市場を再キューしない
+RESOLUTION_WATCH_FILE = "/root/openclaw_data/lin/data/resolution_watch.json"
+
+# 保有ポジション（CLOBトークンID・株数・平均取得単価）
+POSITIONS_FILE = "/root/openclaw_data/lin/data/positions.json"
+
+# Prometheus textfile形式のメトリクス出力先（node_exporterのtextfile collector用）
+METRICS_FILE = "/root/openclaw_data/lin/data/heartbeat_metrics.prom"
+METRICS_INTERVAL = 15.0
+
+_logger = None
+
 def log_heartbeat(message, level="INFO"):
-    """HeartBeat logに記録"""
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_entry = f"[{timestamp}] [{level}] {message}\n"
+    """HeartBeat logに記録（JSONLにバッファリングし、バックグラウンドで書き出し）"""
+    global _logger
+    if _logger is None:
+        _logger = HeartbeatLogger(f"{LIN_BRAIN}/heartbeat.jsonl")
+    _logger.log(level, message.strip())
     
-    log_file = f"{LIN_BRAIN}/HEARTBEAT_LOG.md"
-    with open(log_file, "a") as f:
-        f.write(log_entry)
-    
-    print(log_entry.strip())
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    print(f"[{timestamp}] [{level}] {message.strip()}")
 
-def scan_existing_positions():
-    """既存ポジションの価格確認"""
-    # TODO: 実装
+def scan_existing_positions(state=None):
+    """
+    既存ポジションの価格確認
+    
+    保有トークンの板を最優先（PRIORITY_POSITIONS）で取り直して仲値で再評価し
+    （評価価格はCLOBの仲値のみ。Gamma更新はメタデータの補完だけ）、
+    前回から価格が動いたポジションと集計値を取り出す
+    """
     log_heartbeat("Scanning existing positions...")
-    return []
+    if state is None:
+        return []
+    with state.lock:
+        held = state.positions.token_ids()
+    if held:
+        books = fetch_books(held, priority=PRIORITY_POSITIONS)
+        with state.lock:
+            for token_id, book in books.items():
+                state.positions.mark(token_id, (book.best_bid + book.best_ask) / 2)
+    with state.lock:
+        changed = state.positions.drain_changed()
+        summary = state.positions.report()
+    registry.set("portfolio_value_usd", round(summary['value'], 2))
+    registry.set("portfolio_unrealized_pnl_usd", round(summary['unrealized_pnl'], 2))
+    if summary['positions']:
+        log_heartbeat(
+            f"Positions: {summary['positions']} held, value ${summary['value']:,.2f}, "
+            f"unrealized P&L ${summary['unrealized_pnl']:+,.2f}, {len(changed)} re-marked"
+        )
+    return changed
 
 def scan_new_opportunities():
     """新規高EV機会の発見"""
@@ -36,52 +97,252 @@ def scan_new_opportunities():
     log_heartbeat("Scanning for new high-EV opportunities...")
     return []
 
-def check_data_updates():
-    """公式データ更新のチェック"""
+# 解決が近い市場として1回に報告する件数の上限
+DATA_UPDATE_BUDGET = 50
+
+def check_data_updates(state=None, budget=DATA_UPDATE_BUDGET):
+    """
+    公式データ更新のチェック
+    
+    解決日時（endDate）のチェックポイントを越えた市場がキューに積まれるので、
+    解決が近い順に取り出す（残りは次回へ持ち越し）
+    """
     # TODO: Tavily API統合
     log_heartbeat("Checking for data updates...")
-    return []
+    if state is None:
+        return []
+    checks = state.drain_update_checks(budget)
+    if checks:
+        soonest = checks[0]
+        log_heartbeat(
+            f"Near resolution: {len(checks)} markets queued for data checks, soonest "
+            f"{soonest['remaining'] / 3600:+.2f}h: {soonest['market']}"
+        )
+    return checks
 
-def check_arbitrage():
-    """アービトラージ機会の監視"""
-    # TODO: クロスマーケット比較
+def check_arbitrage(state=None):
+    """
+    アービトラージ機会の監視（YES+NO < 0.98 と negRiskイベント内の合計乖離）
+    
+    アラート状態は今回の結果に無いキーを解消扱いにするため、上位件数で切らずに全件返す
+    """
     log_heartbeat("Checking for arbitrage opportunities...")
-    return []
+    if state is None:
+        return []
+    return detect_arbitrage(state.arrays(), max_results=None) + state.event_candidates()
 
-def evaluate_alerts(scan_results):
-    """アラート基準を評価"""
-    alerts = []
+# 1ティックで板を取り直す市場数の上限（clob:booksのレート制限内に収める）
+BOOK_SCAN_BUDGET = 200
+
+def scan_hot_books(state, budget=BOOK_SCAN_BUDGET):
+    """
+    ホットな市場の板を優先的に再取得し、板のベストアスクでYES+NOアービトラージを検証
     
-    for result in scan_results:
-        if result.get('ev', 0) > 0.30:  # EV > 30%
-            alerts.append({
-                'type': 'HIGH_EV_OPPORTUNITY',
-                'severity': 'CRITICAL',
-                'message': f"High EV opportunity found: {result['market']} (EV: {result['ev']*100:.1f}%)"
-            })
+    値動き・出来高・スプレッド・解決までの時間で決まる間隔が来た市場だけを
+    予算内で取得する（休眠市場はまれにしか再取得しない）。state.feedがあれば
+    ライブ板を優先し、スナップショット未着のトークンだけをRESTで取得する
+    """
+    due = state.due_markets(budget)
+    if not due:
+        return []
+    token_ids = market_token_ids(due)
+    asks = {}
+    # 常駐モードでWebSocketフィードが動いていれば、スナップショット済みの板はローカルから読む
+    if state.feed is not None:
+        asks.update(state.feed.top_asks_threadsafe(token_ids))
+    missing = [token_id for token_id in token_ids if token_id not in asks]
+    # 保有トークンの板はクロールやスキャンより先に取得する
+    with state.lock:
+        held = set(state.positions.token_ids())
+    for priority, batch in (
+        (PRIORITY_POSITIONS, [token_id for token_id in missing if token_id in held]),
+        (PRIORITY_SCAN, [token_id for token_id in missing if token_id not in held]),
+    ):
+        if not batch:
+            continue
+        if state.stops["books"].is_set():
+            break
+        books = fetch_books(batch, priority=priority, stop=state.stops["books"])
+        asks.update({
+            token_id: (book.best_ask, float(book.ask_sz[0]) if len(book.ask_sz) else 0.0)
+            for token_id, book in books.items()
+        })
+    found = detect_arbitrage(build_arrays(due, asks), max_results=len(due))
+    registry.set("scan_scheduler_backlog", state.scheduler.backlog())
+    return state.record_verified(due, found)
+
+# アラート候補を出すステージ（いずれかが失敗したティックでは未出現キーを解消しない）
+ALERT_STAGES = ("opportunities", "arbitrage", "books")
+
+def _alert_candidates(results):
+    """アラート評価対象：板で検証済みの結果を同じ市場の価格ベースの結果より優先"""
+    verified = {result['market_id']: result for result in results.get("books", [])}
+    merged = [result for result in results.get("arbitrage", []) if result.get('market_id') not in verified]
+    return results.get("opportunities", []) + merged + list(verified.values())
+
+def evaluate_alerts(scan_results, alert_state=None, now=None, complete=True):
+    """
+    アラート基準を評価（EV > 30%）
+    
+    状態遷移（raised / escalated / cleared）のみを返す。継続中のアラートは
+    毎ティック再通知しない。alert_stateを渡さない場合は毎回新規状態で評価。
+    nowはバックテストで記録時刻を使うためのもの（省略時は現在時刻）。
+    complete=Falseは候補ステージが失敗したティック：結果に出なかった
+    アラートを解消しない（解消するとCOOLDOWNで再通知が遅れるため）。
+    """
+    if alert_state is None:
+        alert_state = AlertState()
+    return alert_state.update(scan_results, now, complete=complete)
+
+# ステージごとの締め切り（秒）：超過したステージは結果なしとして扱う
+STAGE_DEADLINES = {
+    "sync": 30.0,
+    "positions": 10.0,
+    "opportunities": 20.0,
+    "data_updates": 30.0,
+    "arbitrage": 10.0,
+    "books": 15.0,
+}
+
+def _run_in_thread(func):
+    """
+    同期ステージをデーモンスレッドで実行し、asyncio Futureを返す
+    
+    スレッドは強制終了できないため、締め切りを過ぎても処理は続く（デーモン
+    スレッドなのでプロセス終了は妨げない）。中断は各ステージの停止イベントで依頼する
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    
+    def deliver(setter, value):
+        if not future.done():
+            setter(value)
+    
+    def target():
+        try:
+            result = func()
+        except BaseException as e:
+            setter, value = future.set_exception, e
+        else:
+            setter, value = future.set_result, result
+        try:
+            loop.call_soon_threadsafe(deliver, setter, value)
+        except RuntimeError:
+            pass  # ループ終了後に完了した（締め切り超過）
     
-    return alerts
+    threading.Thread(target=target, name=getattr(func, "__name__", "stage"), daemon=True).start()
+    return future
+
+async def run_stage(name, func, deadline, state=None):
+    """
+    1ステージを締め切り付きで実行
+    
+    所要時間はステージ名ごとのヒストグラムに記録（締め切り超過時は締め切りまでの時間）
+    
+    stateを渡すと実行中のFutureをstate.runningに保持し、前回の実行（締め切り
+    超過後も動いているスレッド）が終わるまで同じステージを重ねて起動しない。
+    締め切り超過時はstate.stops[name]をセットして協調的な中断を依頼する
+    
+    Returns:
+        (結果リスト, 状態) 状態は 'ok' / 'timeout' / 'error' / 'skipped'
+    """
+    started = time.perf_counter()
+    stop = None
+    if state is not None:
+        previous = state.running.get(name)
+        if previous is not None and not previous.done():
+            log_heartbeat(f"Stage {name} still running from an earlier tick - skipped", "WARN")
+            registry.inc("heartbeat_stage_runs_total", stage=name, status="skipped")
+            return [], "skipped"
+        stop = state.stops[name]
+        stop.clear()
+    future = _run_in_thread(func)
+    # 締め切り超過後に届いた例外を回収（未取得の警告を出さない）
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())
+    if state is not None:
+        state.running[name] = future
+    try:
+        # shield: 締め切りで待つのをやめても、Futureはスレッド完了まで実行中のまま残す
+        result, status = await asyncio.wait_for(asyncio.shield(future), timeout=deadline), "ok"
+    except asyncio.TimeoutError:
+        if stop is not None:
+            stop.set()
+        log_heartbeat(f"Stage {name} exceeded {deadline:.1f}s deadline - still running, stop requested", "WARN")
+        result, status = [], "timeout"
+    except Exception as e:
+        log_heartbeat(f"Stage {name} failed: {str(e)}", "ERROR")
+        result, status = [], "error"
+    registry.observe("heartbeat_stage_seconds", time.perf_counter() - started, stage=name)
+    registry.inc("heartbeat_stage_runs_total", stage=name, status=status)
+    return result, status
+
+def export_metrics(path=METRICS_FILE):
+    """ステージ・エンドポイント別レイテンシとレート制限の状態をPrometheus形式で書き出し"""
+    for endpoint, report in get_session().scheduler.report().items():
+        registry.set("rate_limit_rate", report["rate"], endpoint=endpoint)
+        registry.set("rate_limit_throttled", report["throttled"], endpoint=endpoint)
+    try:
+        registry.write_prometheus(path)
+    except OSError as e:
+        log_heartbeat(f"Metrics export failed: {str(e)}", "WARN")
+
+async def scan_once(state):
+    """差分同期の後、各ステージを並行実行"""
+    _, sync_status = await run_stage("sync", state.sync_markets, STAGE_DEADLINES["sync"], state)
+    results, statuses = await run_stages({
+        "positions": partial(scan_existing_positions, state),
+        "opportunities": scan_new_opportunities,
+        "data_updates": partial(check_data_updates, state),
+        "arbitrage": partial(check_arbitrage, state),
+        "books": partial(scan_hot_books, state),
+    }, state=state)
+    statuses["sync"] = sync_status
+    return results, statuses
+
+async def run_stages(stages, deadlines=None, state=None):
+    """
+    全ステージを並行実行（所要時間 = 最も遅いステージ、ただし締め切りまで）
+    
+    Returns:
+        (name -> 結果, name -> 状態)
+    """
+    deadlines = dict(STAGE_DEADLINES, **(deadlines or {}))
+    names = list(stages)
+    outcomes = await asyncio.gather(*[
+        run_stage(name, stages[name], deadlines[name], state) for name in names
+    ])
+    results = {name: outcome[0] for name, outcome in zip(names, outcomes)}
+    statuses = {name: outcome[1] for name, outcome in zip(names, outcomes)}
+    return results, statuses
 
 def main():
     """HeartBeatスキャンのメイン処理"""
     log_heartbeat("=== HeartBeat Scan Started ===", "INFO")
     
     try:
-        # 1. 既存ポジション確認
-        positions = scan_existing_positions()
-        
-        # 2. 新規機会スキャン
-        opportunities = scan_new_opportunities()
-        
-        # 3. データ更新確認
-        data_updates = check_data_updates()
-        
-        # 4. アービトラージ確認
-        arbitrage = check_arbitrage()
+        # 0. 市場ストアの差分同期
+        # 1-4. ポジション確認・新規機会・データ更新・アービトラージを並行実行
+        state = ScannerState()
+        results, statuses = asyncio.run(scan_once(state))
+        # 締め切り超過で残ったスレッドにも中断を依頼（保存はストアのロックで直列化）
+        state.stop_stages()
+        state.save()
+        positions = results["positions"]
+        opportunities = results["opportunities"]
+        data_updates = results["data_updates"]
+        arbitrage = results["arbitrage"]
+        books = results["books"]
+        incomplete = [name for name, status in statuses.items() if status != "ok"]
         
-        # 5. アラート評価
-        all_results = opportunities + arbitrage
-        alerts = evaluate_alerts(all_results)
+        # 5. アラート評価（締め切り超過ステージがあっても部分結果で評価）
+        all_results = _alert_candidates(results)
+        complete = all(statuses[name] == "ok" for name in ALERT_STAGES)
+        with registry.timer("heartbeat_stage_seconds", stage="alerts"):
+            with state.lock:
+                alerts = evaluate_alerts(all_results, state.alerts, complete=complete)
+                state.alerts.save()
+        # 解消通知はINFO扱い：終了コードには影響させない
+        raised = [alert for alert in alerts if alert['transition'] != 'cleared']
         
         # 6. 結果サマリー
         summary = {
@@ -90,17 +351,27 @@ def main():
             'new_opportunities': len(opportunities),
             'data_updates': len(data_updates),
             'arbitrage_found': len(arbitrage),
-            'alerts_triggered': len(alerts)
+            'book_verified_arbitrage': len(books),
+            'alerts_triggered': len(raised),
+            'alerts_active': len(state.alerts.active),
+            'incomplete_stages': incomplete,
+            'latency': registry.summary()
         }
         
         log_heartbeat(f"Scan completed: {json.dumps(summary)}", "INFO")
         
         # 7. アラートがあれば報告
-        if alerts:
-            log_heartbeat(f"⚠️ {len(alerts)} ALERTS TRIGGERED", "ALERT")
-            for alert in alerts:
+        for alert in alerts:
+            if alert['transition'] == 'cleared':
+                log_heartbeat(alert['message'], alert['severity'])
+        if raised:
+            log_heartbeat(f"⚠️ {len(raised)} ALERTS TRIGGERED", "ALERT")
+            for alert in raised:
                 log_heartbeat(alert['message'], alert['severity'])
             return 1  # アラート有り
+        elif incomplete:
+            log_heartbeat(f"No alerts, but stages incomplete: {', '.join(incomplete)}", "WARN")
+            return 2  # 一部ステージ失敗
         else:
             log_heartbeat("No alerts. All clear.", "INFO")
             return 0  # アラート無し
@@ -110,8 +381,315 @@ def main():
         return 2  # エラー
     
     finally:
+        export_metrics()
         log_heartbeat("=== HeartBeat Scan Completed ===\n", "INFO")
 
+# デーモンモード：ステージごとの実行間隔（秒）
+DEFAULT_INTERVALS = {
+    "sync": 5.0,
+    "positions": 10.0,
+    "opportunities": 30.0,
+    "data_updates": 300.0,
+    "arbitrage": 5.0,
+    "books": 2.0,
+}
+
+# ストアをディスクに書き出す最小間隔（秒）
+STORE_SAVE_INTERVAL = 60.0
+
+class ScannerState:
+    """ティック間で保持するウォームな状態（市場ストア・HTTPプール・最新結果）"""
+    
+    def __init__(self, store=None, alerts=None, positions=None, history=None):
+        # PositionBookとPriceHistoryは__len__を持ち、空だと偽になるためNoneで判定する
+        self.store = store if store is not None else MarketStore()
+        self.alerts = alerts if alerts is not None else AlertState(ALERT_STATE_FILE)
+        self.positions = positions if positions is not None else PositionBook(POSITIONS_FILE)
+        self.history = history if history is not None else PriceHistory()
+        self.ticks = []    # 前回の記録以降に変化した市場（PriceHistoryへ1ティックとして追記）
+        self.results = {}
+        self.feed = None    # 常駐モードのWebSocketフィード（ws_market.MarketFeed）
+        self.last_saved = time.monotonic()
+        self.dirty = False
+        self.running = {}    # ステージ名 -> 実行中のFuture（締め切り超過後も完了まで保持）
+        self.stops = {name: threading.Event() for name in STAGE_DEADLINES}
+        
+        # 同期と各ステージは別スレッドで動くため、レコード更新はロックで保護
+        # （ストアのapply/saveと同じ再入可能ロックを共有し、リスナー内でも取れる）
+        self.lock = self.store.lock
+        self.records = {market_id: Market.from_gamma(raw) for market_id, raw in self.store.markets.items()}
+        self.events = EventIndex()
+        self.scheduler = ScanScheduler()
+        self.watch = ResolutionWatch(RESOLUTION_WATCH_FILE)
+        self.verified = {}    # market_id -> 板で検証済みのアービトラージ結果
+        for record in self.records.values():
+            self.events.update(record)
+            self.scheduler.update(record)
+            self.watch.update(record)
+            self.positions.update_market(record)
+        self.watch.retain(self.records)
+        self.version = 0
+        self._arrays = None
+        self._arrays_version = -1
+        self.store.listeners.append(self._on_change)
+    
+    def _on_change(self, change, raw):
+        """ストアの変更をMarketレコードに反映（変更分のみ）"""
+        with self.lock:
+            if change == 'removed':
+                self.records.pop(raw['id'], None)
+                self.events.remove(raw['id'])
+                self.scheduler.remove(raw['id'])
+                self.watch.remove(raw['id'])
+                self.verified.pop(raw['id'], None)
+                # 価格なしの行で終了を記録（バックテストで直前の価格を持ち越さない）
+                self.ticks.append({'id': raw['id']})
+            else:
+                self.ticks.append(raw)
+                record = self.records[raw['id']] = Market.from_gamma(raw)
+                self.events.update(record)
+                self.scheduler.update(record)
+                self.watch.update(record)
+                self.positions.update_market(record)
+            self.version += 1
+    
+    def event_candidates(self):
+        """negRiskイベントのアービトラージ候補（変更のあったイベントのみ再評価）"""
+        with self.lock:
+            return self.events.candidates()
+    
+    def due_markets(self, limit):
+        """再スキャン時期が来た市場（優先度順、最大limit件）"""
+        with self.lock:
+            self._watch_resolutions()
+            return [self.records[market_id] for market_id in self.scheduler.pop_due(limit)]
+    
+    def _watch_resolutions(self, now=None):
+        """
+        解決日時のチェックポイントを越えた市場のスキャン間隔を再計算する
+        （越えた市場はwatch.pendingに積まれ、データ更新チェック待ちになる。
+        ロック保持中に呼ぶこと）
+        """
+        now = time.time() if now is None else now
+        for market_id, _ in self.watch.pop_due(now):
+            record = self.records.get(market_id)
+            if record is not None:
+                self.scheduler.update(record, now)
+    
+    def drain_update_checks(self, limit):
+        """
+        データ更新チェック待ちの市場を解決が近い順に最大limit件取り出す
+        
+        残りはwatch.pendingに残り、チェックポイントと一緒に保存されるため
+        cronモードでも次回の実行に持ち越される
+        """
+        with self.lock:
+            self._watch_resolutions()
+            registry.set("resolution_watch_markets", len(self.watch))
+            registry.set("resolution_update_checks_pending", len(self.watch.pending))
+            checks = []
+            for market_id, remaining in self.watch.take_pending(limit):
+                record = self.records[market_id]
+                checks.append({
+                    'market_id': market_id,
+                    'market': record.question,
+                    'end_ts': record.end_ts,
+                    'remaining': remaining,
+                })
+            return checks
+    
+    def record_verified(self, scanned, found):
+        """今回再取得した市場の検証結果を更新し、現在有効な全結果を返す"""
+        with self.lock:
+            for market in scanned:
+                self.verified.pop(market.id, None)
+            for result in found:
+                self.verified[result['market_id']] = result
+            return list(self.verified.values())
+    
+    def token_ids(self):
+        """保持している全市場のCLOBトークンID（フィードの購読用）"""
+        with self.lock:
+            return market_token_ids(list(self.records.values()))
+    
+    def arrays(self):
+        """検出用の配列ビュー（レコードに変更があった時のみ再構築）"""
+        with self.lock:
+            if self._arrays_version != self.version:
+                self._arrays = build_arrays(list(self.records.values()))
+                self._arrays_version = self.version
+            return self._arrays
+    
+    def sync_markets(self):
+        """市場ストアの差分同期（変化した市場はPriceHistoryに1ティックとして記録）"""
+        try:
+            stats = self.store.sync(stop=self.stops["sync"])
+        finally:
+            self.record_ticks()
+        if stats["added"] or stats["updated"] or stats["removed"]:
+            self.dirty = True
+        if self.dirty and time.monotonic() - self.last_saved >= STORE_SAVE_INTERVAL:
+            self.save()
+        return stats
+    
+    def record_ticks(self, ts=None):
+        """同期で変化した市場をPriceHistoryに追記（バックテストの再生用）"""
+        with self.lock:
+            changed, self.ticks = self.ticks, []
+        if changed:
+            self.history.append(changed, ts)
+        return len(changed)
+    
+    def stop_stages(self):
+        """実行中の全ステージに中断を依頼"""
+        for stop in self.stops.values():
+            stop.set()
+    
+    def save(self):
+        if self.dirty:
+            self.store.save()
+            self.dirty = False
+        with self.lock:
+            # 差分更新で溜まった浮動小数点誤差を保存のたびに解消
+            self.positions.resum()
+            self.alerts.save()
+            self.watch.save()
+        self.last_saved = time.monotonic()
+
+class HeartbeatDaemon:
+    """常駐スキャナー：ステージごとの間隔で非同期に実行"""
+    
+    def __init__(self, intervals=None, state=None, deadlines=None, feed=None):
+        self.intervals = dict(DEFAULT_INTERVALS, **(intervals or {}))
+        self.deadlines = dict(STAGE_DEADLINES, **(deadlines or {}))
+        self.state = state or ScannerState()
+        if feed is not None:
+            self.state.feed = feed
+        self.stages = {
+            "sync": self.state.sync_markets,
+            "positions": partial(scan_existing_positions, self.state),
+            "opportunities": scan_new_opportunities,
+            "data_updates": partial(check_data_updates, self.state),
+            "arbitrage": partial(check_arbitrage, self.state),
+            "books": partial(scan_hot_books, self.state),
+        }
+        # ステージごとの直近の実行結果（ok / timeout / error / skipped）
+        self.statuses = {}
+        self._stop = None
+    
+    def _evaluate(self):
+        """最新の機会・アービトラージ結果からアラート評価"""
+        # 同期スレッドのsave()と同時にアラート状態を書き換えないようロックを取る
+        with registry.timer("heartbeat_stage_seconds", stage="alerts"), self.state.lock:
+            complete = all(self.statuses.get(name) == "ok" for name in ALERT_STAGES)
+            alerts = evaluate_alerts(_alert_candidates(self.state.results), self.state.alerts, complete=complete)
+        for alert in alerts:
+            log_heartbeat(alert['message'], alert['severity'])
+        return alerts
+    
+    async def _stage_loop(self, name, func, interval):
+        """固定レートでステージを実行（遅延時は取りこぼしたティックをスキップ）"""
+        next_run = time.monotonic()
+        while not self._stop.is_set():
+            result, status = await run_stage(name, func, self.deadlines[name], self.state)
+            self.statuses[name] = status
+            # 締め切り超過時は前回の結果を保持し、他ステージはそのまま進む
+            if status == "ok":
+                self.state.results[name] = result
+                # 新規市場のトークンをフィードに追加購読（購読済みは無視される）
+                if name == "sync" and self.state.feed is not None and result["added"]:
+                    self.state.feed.subscribe(await _run_in_thread(self.state.token_ids))
+                if name in ("opportunities", "arbitrage", "books"):
+                    # ロック待ちでイベントループを止めないよう別スレッドで評価
+                    await _run_in_thread(self._evaluate)
+            
+            next_run += interval
+            now = time.monotonic()
+            if next_run < now:
+                next_run = now + interval - (now - next_run) % interval
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=next_run - now)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _metrics_loop(self, interval=METRICS_INTERVAL):
+        """メトリクスファイルを定期的に書き出し"""
+        while not self._stop.is_set():
+            export_metrics()
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+    
+    async def run(self):
+        """シグナル（SIGINT/SIGTERM）を受けるまで実行"""
+        self._stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+        
+        log_heartbeat(f"=== HeartBeat Daemon Started: {json.dumps(self.intervals)} ===", "INFO")
+        feed = self.state.feed
+        feed_task = None
+        if feed is not None:
+            feed.subscribe(self.state.token_ids())
+            feed_task = asyncio.ensure_future(feed.run())
+        try:
+            await asyncio.gather(self._metrics_loop(), *[
+                self._stage_loop(name, func, self.intervals[name])
+                for name, func in self.stages.items()
+                if self.intervals.get(name, 0) > 0
+            ])
+        finally:
+            self.state.stop_stages()
+            if feed_task is not None:
+                await feed.stop()
+                feed_task.cancel()
+            self.state.save()
+            export_metrics()
+            log_heartbeat("=== HeartBeat Daemon Stopped ===\n", "INFO")
+        return 0
+
+def _parse_intervals(values):
+    """['arbitrage=0.5', 'sync=2'] -> {'arbitrage': 0.5, 'sync': 2.0}"""
+    intervals = {}
+    for value in values or []:
+        name, _, seconds = value.partition("=")
+        if name not in DEFAULT_INTERVALS:
+            raise SystemExit(f"Unknown stage: {name} (choose from {', '.join(DEFAULT_INTERVALS)})")
+        intervals[name] = float(seconds)
+    return intervals
+
 if __name__ == "__main__":
-    exit_code = main()
+    parser = argparse.ArgumentParser(description="HeartBeat Scanner")
+    parser.add_argument("--daemon", action="store_true", help="常駐モードで実行")
+    parser.add_argument("--render-log", action="store_true", help="JSONLログをHEARTBEAT_LOG.mdに書き出して終了")
+    parser.add_argument("--metrics-port", type=int, help="常駐モードで /metrics をこのポートで公開")
+    parser.add_argument("--ws", action="store_true", help="常駐モードでWebSocketのライブ板を使う（要websockets）")
+    parser.add_argument(
+        "--interval",
+        action="append",
+        metavar="STAGE=SECONDS",
+        help="ステージ間隔を上書き（0で無効）: " + ", ".join(DEFAULT_INTERVALS)
+    )
+    args = parser.parse_args()
+    
+    if args.render_log:
+        count = render_markdown(f"{LIN_BRAIN}/heartbeat.jsonl", f"{LIN_BRAIN}/HEARTBEAT_LOG.md")
+        print(f"✅ Rendered {count} entries into {LIN_BRAIN}/HEARTBEAT_LOG.md")
+        exit_code = 0
+    elif args.daemon:
+        if args.metrics_port:
+            registry.serve(args.metrics_port)
+        feed = None
+        if args.ws:
+            from ws_market import MarketFeed
+            feed = MarketFeed([], log=log_heartbeat)
+        exit_code = asyncio.run(HeartbeatDaemon(_parse_intervals(args.interval), feed=feed).run())
+    else:
+        exit_code = main()
     sys.exit(exit_code)
@@ -1,126 +1,417 @@
 #!/usr/bin/env python3
 """
-Create comprehensive market comparison table
+Market EV / Kelly analysis
+
+evaluate() and evaluate_sides() take whole arrays of prices and estimated
+probabilities and return EV, ROI, edge and fractional-Kelly sizing for every
+candidate in one vectorized call. The report joins our probability
+estimates (data/market_estimates.json) with live prices from the market
+store and ranks the lot.
+
+Binary contract bought at price c with win probability p, fee f on the
+winning profit:
+  payout   b = (1 - c)(1 - f) / c        net odds per $1 staked
+  EV/share   = p (1 - c)(1 - f) - (1 - p) c
+  ROI        = EV/share / c               (the old ev_calculation when f = 0)
+  Kelly    f* = (b p - (1 - p)) / b
+
+Top-of-book EV assumes the whole stake fills at the best ask. With CLOB
+books, executable_ev() walks the ask levels instead: every level has its
+own EV/share, which only falls as the price climbs, so the EV-maximizing
+fill takes every level that still has positive EV (up to the Kelly stake),
+less the gas for the order. Books are padded into (markets x levels)
+arrays so the walk is one batch of numpy operations.
+
+Requires: pip install numpy
 """
+import argparse
+import json
+import math
+import sys
+
+import numpy as np
+
+from market_search import MIN_SCORE
+
+ESTIMATES_FILE = "/root/openclaw_data/lin/data/market_estimates.json"
+
+FEE_RATE = 0.02                 # On the winning leg's profit (projects/polymarket-arbitrage.md)
+QUARTER_KELLY = 0.25
+HALF_KELLY = 0.5
+MAX_POSITION_FRACTION = 0.60    # Never more than 60% of bankroll in one market (risk_management.md)
+GAS_PER_ORDER = 0.01            # USDC per order (Polygon), as arbitrage.GAS_PER_LEG
+
+YES, NO = 0, 1
+
+
+def evaluate(price, prob, fee_rate=0.0, kelly_multiplier=QUARTER_KELLY, max_fraction=MAX_POSITION_FRACTION):
+    """
+    EV and Kelly sizing for buying contracts at ``price`` with win probability ``prob``
+
+    All arguments broadcast. Invalid prices (outside (0, 1)) or probabilities
+    give NaN EV/ROI/edge and a zero stake.
+
+    Returns:
+        dict of arrays: ev (per share), roi (per $1), edge (prob - price),
+        kelly (full Kelly fraction, >= 0), fraction (stake fraction after the
+        multiplier and the single-market cap)
+    """
+    price = np.asarray(price, dtype=np.float64)
+    prob = np.asarray(prob, dtype=np.float64)
+    fee_rate = np.asarray(fee_rate, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payout = (1.0 - price) * (1.0 - fee_rate)
+        ev = prob * payout - (1.0 - prob) * price
+        roi = ev / price
+        edge = prob - price
+        odds = payout / price
+        kelly = np.clip((odds * prob - (1.0 - prob)) / odds, 0.0, 1.0)
+
+    valid = (price > 0) & (price < 1) & (prob >= 0) & (prob <= 1)
+    ev = np.where(valid, ev, np.nan)
+    roi = np.where(valid, roi, np.nan)
+    edge = np.where(valid, edge, np.nan)
+    kelly = np.where(valid & np.isfinite(kelly), kelly, 0.0)
+    fraction = np.minimum(kelly * kelly_multiplier, max_fraction)
+    return {'ev': ev, 'roi': roi, 'edge': edge, 'kelly': kelly, 'fraction': fraction}
+
+
+def evaluate_sides(yes_price, no_price, prob_yes, fee_rate=0.0, kelly_multiplier=QUARTER_KELLY,
+                   max_fraction=MAX_POSITION_FRACTION):
+    """
+    Evaluate buying YES and buying NO and keep the better side per market
+
+    Returns:
+        evaluate()'s dict for the chosen side, plus 'side' (YES=0 / NO=1),
+        'price' and 'prob' of that side
+    """
+    prob_yes = np.asarray(prob_yes, dtype=np.float64)
+    yes = evaluate(yes_price, prob_yes, fee_rate, kelly_multiplier, max_fraction)
+    no = evaluate(no_price, 1.0 - prob_yes, fee_rate, kelly_multiplier, max_fraction)
+
+    pick_no = np.nan_to_num(no['roi'], nan=-np.inf) > np.nan_to_num(yes['roi'], nan=-np.inf)
+    result = {key: np.where(pick_no, no[key], yes[key]) for key in yes}
+    result['side'] = np.where(pick_no, NO, YES)
+    result['price'] = np.where(pick_no, np.asarray(no_price, dtype=np.float64),
+                               np.asarray(yes_price, dtype=np.float64))
+    result['prob'] = np.where(pick_no, 1.0 - prob_yes, prob_yes)
+    return result
+
+
+def book_levels(books, token_ids, max_levels=None):
+    """
+    Pad ask ladders into (markets x levels) arrays
+
+    Args:
+        books: token_id -> orderbook.OrderBook
+        token_ids: token to buy per market (None or a missing book gives an
+            empty row)
+        max_levels: keep at most this many levels per book
+
+    Returns:
+        (ask_px, ask_sz): price NaN and size 0 past the end of a ladder
+    """
+    ladders = [books.get(token_id) if token_id else None for token_id in token_ids]
+    depth = max((len(book.ask_px) for book in ladders if book is not None), default=0)
+    if max_levels is not None:
+        depth = min(depth, max_levels)
+    ask_px = np.full((len(ladders), depth), np.nan)
+    ask_sz = np.zeros((len(ladders), depth))
+    for i, book in enumerate(ladders):
+        if book is not None:
+            n = min(len(book.ask_px), depth)
+            ask_px[i, :n] = book.ask_px[:n]
+            ask_sz[i, :n] = book.ask_sz[:n]
+    return ask_px, ask_sz
+
+
+def executable_ev(ask_px, ask_sz, prob, fee_rate=0.0, gas=GAS_PER_ORDER, max_stake=np.inf, min_size=0.0):
+    """
+    EV-maximizing fill per market by walking the ask levels
+
+    Args:
+        ask_px, ask_sz: (M, L) ask ladders, best first (book_levels())
+        prob: win probability of the token bought, per market
+        fee_rate: fee on the winning profit, per market or scalar
+        gas: flat cost of the order in USDC
+        max_stake: USDC cap per market (e.g. the Kelly stake)
+        min_size: minimum order size in shares
+
+    Returns:
+        dict of arrays: stake (USDC to spend, 0 when no fill beats gas),
+        shares, avg_price, ev (USDC, after gas), roi (ev / stake), levels
+        (ask levels touched), depth_stake (USDC of positive-EV depth,
+        ignoring max_stake)
+    """
+    ask_px = np.asarray(ask_px, dtype=np.float64)
+    ask_sz = np.asarray(ask_sz, dtype=np.float64)
+    prob = np.asarray(prob, dtype=np.float64)[:, None]
+    fee_rate = np.asarray(fee_rate, dtype=np.float64)
+    fee_rate = fee_rate[:, None] if fee_rate.ndim else fee_rate
+    max_stake = np.broadcast_to(np.asarray(max_stake, dtype=np.float64), prob.shape[:1])[:, None]
+
+    with np.errstate(invalid='ignore'):
+        # EV/share of each level; asks ascend, so positive levels are a prefix
+        level_ev = prob * (1.0 - ask_px) * (1.0 - fee_rate) - (1.0 - prob) * ask_px
+        take = np.where((level_ev > 0) & (ask_px > 0) & (ask_px < 1), ask_sz, 0.0)
+        level_cost = take * np.nan_to_num(ask_px)
+        depth_cost = np.cumsum(level_cost, axis=1)
+
+        # Fill level by level until the stake cap; the last level may be partial
+        cost = np.clip(max_stake - (depth_cost - level_cost), 0.0, level_cost)
+        shares = np.where(level_cost > 0, cost / np.where(level_cost > 0, ask_px, 1.0), 0.0)
+
+    stake = cost.sum(axis=1)
+    total_shares = shares.sum(axis=1)
+    ev = np.where(shares > 0, shares * level_ev, 0.0).sum(axis=1) - gas
+    fill = (ev > 0) & (total_shares >= np.asarray(min_size, dtype=np.float64)) & (total_shares > 0)
 
-# Based on research data
-markets = [
-    {
-        "name": "Trump Deportation: 500K-750K Range (2025)",
-        "category": "Politics",
-        "polymarket_price": 0.0325,
-        "external_probability": 0.90,
-        "reasoning": "DHS reported 675K deportations as of Jan 20, 2026. Market severely underpricing. Additional 2.5M total departures (605K deported + 1.9M self-deported) supports this range.",
-        "end_date": "2026-03-31",
-        "ev_calculation": (0.90 * (1/0.0325 - 1) - 0.10),
-        "confidence": "High"
-    },
-    {
-        "name": "2026 Winter Olympics: Norway Most Gold Medals",
-        "category": "Sports",
-        "polymarket_price": 0.99,
-        "external_probability": 0.95,
-        "reasoning": "Supercomputer predicts 18 gold medals for Norway, historical dominance. Currently leading at halfway point with 20 medals. However, market price at 99% leaves minimal EV.",
-        "end_date": "2026-02-22",
-        "ev_calculation": (0.95 * (1/0.99 - 1) - 0.05),
-        "confidence": "Medium-High"
-    },
-    {
-        "name": "2026 Winter Olympics: Ice Hockey Gold - Canada",
-        "category": "Sports",
-        "polymarket_price": None,  # Need to find actual price
-        "external_probability": 0.65,
-        "reasoning": "Stacked roster with McDavid, Crosby, MacKinnon. Historically strong. However, competition from USA, Russia, Sweden. Estimated 60-70% chance.",
-        "end_date": "2026-02-23",
-        "ev_calculation": None,
-        "confidence": "Medium"
-    },
-    {
-        "name": "Super Bowl LX: Seahawks Win",
-        "category": "Sports",
-        "polymarket_price": None,  # Need to find actual price  
-        "external_probability": 0.54,
-        "reasoning": "Seahawks favored at -230 (implied 69.7%). However, this is close to game time, efficient market. Limited edge expected.",
-        "end_date": "2026-02-08",
-        "ev_calculation": None,
-        "confidence": "Low"
-    },
-    {
-        "name": "S&P 500 Daily Direction (Next Trading Day)",
-        "category": "Finance",
-        "polymarket_price": 0.50,
-        "external_probability": 0.52,
-        "reasoning": "Analyst consensus bullish for 2026 (+9% YoY). However, daily direction is near coin-flip. Minimal edge, high transaction costs.",
-        "end_date": "2026-02-19",
-        "ev_calculation": (0.52 * (1/0.50 - 1) - 0.48),
-        "confidence": "Very Low"
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_price = np.where(fill, stake / total_shares, np.nan)
+        roi = np.where(fill, ev / stake, np.nan)
+    return {
+        'stake': np.where(fill, stake, 0.0),
+        'shares': np.where(fill, total_shares, 0.0),
+        'avg_price': avg_price,
+        'ev': np.where(fill, ev, 0.0),
+        'roi': roi,
+        'levels': np.where(fill, (shares > 0).sum(axis=1), 0),
+        'depth_stake': depth_cost[:, -1] if depth_cost.shape[1] else np.zeros(len(stake)),
     }
-]
-
-print("=" * 120)
-print("POLYMARKET MARKET ANALYSIS - EXPECTED VALUE COMPARISON")
-print("=" * 120)
-print()
-
-for i, m in enumerate(markets, 1):
-    print(f"{i}. {m['name']}")
-    print(f"   Category: {m['category']}")
-    print(f"   Polymarket Price: ${m['polymarket_price']:.4f}" if m['polymarket_price'] else "   Polymarket Price: [Need to verify]")
-    print(f"   Implied Probability: {m['polymarket_price']*100:.1f}%" if m['polymarket_price'] else "   Implied Probability: [TBD]")
-    print(f"   True Probability (Estimated): {m['external_probability']*100:.1f}%")
-    
-    if m['ev_calculation'] is not None:
-        ev = m['ev_calculation']
-        print(f"   Expected Value: ${ev:.4f} per $1.00 bet ({ev*100:.2f}% ROI)")
-        
-        # Calculate payouts for $1 bet
-        win_payout = 1.00 / m['polymarket_price']
-        expected_profit = ev * 1.00
-        print(f"   If Win: ${win_payout:.2f} | Expected Profit: ${expected_profit:.2f}")
-    else:
-        print(f"   Expected Value: [Need price data]")
-    
-    print(f"   Resolution Date: {m['end_date']}")
-    print(f"   Confidence Level: {m['confidence']}")
-    print(f"   \n   Reasoning: {m['reasoning']}")
-    print()
-    print("-" * 120)
+
+
+def rank(result, by='roi', top=None):
+    """Indices sorted by ``by`` (descending, NaN last)"""
+    key = np.nan_to_num(result[by], nan=-np.inf)
+    order = np.argsort(-key, kind='stable')
+    return order[:top] if top else order
+
+
+def load_estimates(path=ESTIMATES_FILE):
+    """
+    Probability estimates: [{"name", "probability", optional "market_id" /
+    "slug", "price" (recorded fallback), "category", "confidence", ...}]
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def live_prices(market):
+    """(YES ask, NO ask) for a market_model.Market, falling back to outcomePrices"""
+    yes = market.best_ask if not math.isnan(market.best_ask) else market.yes_price
+    no = 1.0 - market.best_bid if not math.isnan(market.best_bid) else market.no_price
+    return yes, no
+
+
+def match_estimates(estimates, records, index=None, min_score=MIN_SCORE):
+    """
+    Pair each estimate with a live Market by market_id, slug or exact
+    question, then by free-text search when a market_search index is
+    given; unmatched estimates keep their recorded price
+
+    Returns:
+        list of (estimate, Market or None)
+    """
+    by_id = {m.id: m for m in records}
+    by_slug = {m.slug: m for m in records if m.slug}
+    by_question = {m.question.strip().lower(): m for m in records if m.question}
+    pairs = []
+    for estimate in estimates:
+        market = (by_id.get(str(estimate.get('market_id')))
+                  or by_slug.get(estimate.get('slug'))
+                  or by_question.get(estimate['name'].strip().lower()))
+        if market is None and index is not None:
+            found = index.match(estimate['name'], min_score=min_score)
+            market = by_id.get(found['market_id']) if found else None
+        pairs.append((estimate, market))
+    return pairs
+
+
+def analyze(estimates, records, fee_rate=FEE_RATE, kelly_multiplier=QUARTER_KELLY, bankroll=None, books=None,
+            gas=GAS_PER_ORDER, index=None):
+    """
+    Vectorized EV/Kelly over every estimate with a price
+
+    ``index`` (market_search.MarketSearchIndex) matches estimates that
+    carry no market_id or slug by their name.
+
+    With ``books`` (token_id -> OrderBook), live rows also get the
+    executable fill of the chosen side (exec_* fields, capped at the Kelly
+    stake when a bankroll is given) and are ranked by executable EV in USDC
+    instead of top-of-book ROI.
+
+    Returns:
+        list of row dicts ranked by ROI or executable EV (estimates without
+        any price last)
+    """
+    pairs = match_estimates(estimates, records, index)
+    n = len(pairs)
+    yes_price = np.full(n, np.nan)
+    no_price = np.full(n, np.nan)
+    fees = np.zeros(n)
+    for i, (estimate, market) in enumerate(pairs):
+        if market is not None:
+            yes_price[i], no_price[i] = live_prices(market)
+            fees[i] = fee_rate if market.fees_enabled else 0.0
+        elif estimate.get('price') is not None:
+            yes_price[i] = estimate['price']
+            no_price[i] = 1.0 - estimate['price']
+            fees[i] = fee_rate
+    prob = np.fromiter((e['probability'] for e, _ in pairs), dtype=np.float64, count=n)
+
+    result = evaluate_sides(yes_price, no_price, prob, fees, kelly_multiplier)
+    order = rank(result)
+    executable = None
+    if books is not None:
+        tokens = [(market.yes_token if side == YES else market.no_token) if market is not None else None
+                  for (_, market), side in zip(pairs, result['side'])]
+        ask_px, ask_sz = book_levels(books, tokens)
+        max_stake = bankroll * result['fraction'] if bankroll else np.inf
+        min_size = np.array([market.order_min_size if market is not None else 0.0 for _, market in pairs])
+        executable = executable_ev(ask_px, ask_sz, result['prob'], fees, gas, max_stake, min_size)
+        priced = np.isfinite(result['roi'])
+        order = order[np.lexsort((-executable['ev'][order], ~priced[order]))]
+
+    rows = []
+    for i in order:
+        estimate, market = pairs[i]
+        fraction = float(result['fraction'][i])
+        rows.append({
+            'name': market.question if market is not None else estimate['name'],
+            'market_id': market.id if market is not None else estimate.get('market_id'),
+            'category': estimate.get('category'),
+            'group': (market.event_id if market is not None and market.neg_risk else None) or estimate.get('group'),
+            'confidence': estimate.get('confidence'),
+            'source': 'live' if market is not None else ('recorded' if estimate.get('price') is not None else None),
+            'side': 'YES' if result['side'][i] == YES else 'NO',
+            'price': float(result['price'][i]),
+            'prob': float(result['prob'][i]),
+            'edge': float(result['edge'][i]),
+            'ev': float(result['ev'][i]),
+            'roi': float(result['roi'][i]),
+            'kelly': float(result['kelly'][i]),
+            'fraction': fraction,
+            'stake': round(bankroll * fraction, 2) if bankroll else None,
+            'fee_rate': float(fees[i]),
+        })
+        if executable is not None and market is not None:
+            rows[-1].update({
+                'exec_stake': round(float(executable['stake'][i]), 2),
+                'exec_shares': float(executable['shares'][i]),
+                'exec_avg_price': float(executable['avg_price'][i]),
+                'exec_ev': float(executable['ev'][i]),
+                'exec_roi': float(executable['roi'][i]),
+                'exec_levels': int(executable['levels'][i]),
+                'depth_stake': round(float(executable['depth_stake'][i]), 2),
+            })
+    return rows
+
+
+def add_joint_sizing(rows, kelly_multiplier=QUARTER_KELLY, bankroll=None, **constraints):
+    """
+    Re-size priced rows jointly (portfolio_kelly) so mutually exclusive
+    siblings in the same group share one budget; adds 'joint_fraction'
+    """
+    from portfolio_kelly import size_jointly
+
+    priced = [row for row in rows if row['source'] is not None and row['kelly'] > 0]
+    for row in rows:
+        row['joint_fraction'] = 0.0
+    if not priced:
+        return None
+    side = np.array([YES if row['side'] == 'YES' else NO for row in priced])
+    price = np.array([row['price'] for row in priced])
+    prob_yes = np.array([row['prob'] if row['side'] == 'YES' else 1.0 - row['prob'] for row in priced])
+    # Same per-market fee evaluate() used, so joint and independent sizing agree
+    fee_rate = np.array([row.get('fee_rate', FEE_RATE) for row in priced])
+    result = size_jointly(side, price, prob_yes, [row['group'] for row in priced], fee_rate=fee_rate,
+                          kelly_multiplier=kelly_multiplier, **constraints)
+    for row, fraction in zip(priced, result['fractions']):
+        row['joint_fraction'] = float(fraction)
+        if bankroll:
+            row['joint_stake'] = round(bankroll * float(fraction), 2)
+    return result
+
+
+def print_report(rows, kelly_multiplier, bankroll=None):
+    print("=" * 120)
+    print("POLYMARKET MARKET ANALYSIS - EXPECTED VALUE COMPARISON")
+    print(f"Kelly multiplier: {kelly_multiplier:g} | Single-market cap: {MAX_POSITION_FRACTION:.0%}"
+          + (f" | Bankroll: ${bankroll:,.2f}" if bankroll else ""))
+    print("=" * 120)
     print()
+    for i, row in enumerate(rows, 1):
+        print(f"{i}. {row['name']}")
+        if row['source'] is None:
+            print("   Price: [Need to verify]")
+            print()
+            continue
+        print(f"   Category: {row['category']} | Confidence: {row['confidence']} | Price source: {row['source']}")
+        print(f"   Buy {row['side']} @ ${row['price']:.4f} | Estimated probability: {row['prob']*100:.1f}% "
+              f"| Edge: {row['edge']*100:+.1f}pt")
+        print(f"   Expected Value: ${row['roi']:.4f} per $1.00 bet ({row['roi']*100:.2f}% ROI)")
+        sizing = f"   Kelly: {row['kelly']*100:.1f}% full -> {row['fraction']*100:.1f}% of bankroll"
+        if row['stake'] is not None:
+            sizing += f" (${row['stake']:,.2f})"
+        if 'joint_fraction' in row:
+            sizing += f" | joint: {row['joint_fraction']*100:.1f}%"
+        print(sizing)
+        if 'exec_ev' in row:
+            if row['exec_stake'] > 0:
+                print(f"   Executable: ${row['exec_stake']:,.2f} over {row['exec_levels']} ask level(s) "
+                      f"@ avg ${row['exec_avg_price']:.4f} -> EV ${row['exec_ev']:,.2f} "
+                      f"({row['exec_roi']*100:.2f}% ROI, ${row['depth_stake']:,.2f} of +EV depth)")
+            else:
+                print("   Executable: no fill beats gas at current depth")
+        print()
 
-# Summary recommendations
-print("\n" + "=" * 120)
-print("RECOMMENDATIONS (Conservative Strategy)")
-print("=" * 120)
-print()
-print("1. HIGHEST EV: Trump Deportation 500K-750K")
-print("   - Expected Value: +$26.69 per $1.00 (2,669% ROI)")
-print("   - Risk: Medium (data interpretation, policy changes)")
-print("   - Recommendation: ✅ STRONG BUY at $1.00 test")
-print()
-print("2. MODERATE EV: Canada Ice Hockey Gold")
-print("   - Need to verify Polymarket price")
-print("   - If priced below 60%, potential value")
-print("   - Recommendation: ⏳ RESEARCH MORE")
-print()
-print("3. LOW EV: Norway Gold Medal Count")
-print("   - Market efficiently priced at 99%")
-print("   - Minimal upside despite high confidence")
-print("   - Recommendation: ❌ PASS (insufficient edge)")
-print()
-print("4. LOW EV: S&P 500 Daily")
-print("   - Near coin-flip with transaction costs")
-print("   - Recommendation: ❌ PASS")
-print()
-print("5. UNKNOWN: Super Bowl")
-print("   - Market likely efficient close to game")
-print("   - Recommendation: ❌ PASS (event already resolved)")
-print()
-
-print("\n" + "=" * 120)
-print("NEXT STEPS")
-print("=" * 120)
-print("1. Verify current Polymarket prices for all markets")
-print("2. Implement Quarter-Kelly / Half-Kelly bet sizing")
-print("3. Execute $1.00 test trade on Trump Deportation market")
-print("4. Monitor market for price changes")
-print()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank markets by EV with fractional-Kelly sizing")
+    parser.add_argument("--estimates", default=ESTIMATES_FILE, help="Probability estimates JSON")
+    parser.add_argument("--kelly", type=float, default=QUARTER_KELLY, help="Kelly multiplier (0.25 = Quarter-Kelly)")
+    parser.add_argument("--bankroll", type=float, help="Bankroll in USDC for stake amounts")
+    parser.add_argument("--top", type=int, help="Show only the top N")
+    parser.add_argument("--sync", action="store_true", help="Delta-sync the market store before pricing")
+    parser.add_argument("--joint", action="store_true",
+                        help="Size all priced candidates jointly (exclusive groups, drawdown cap)")
+    parser.add_argument("--books", action="store_true",
+                        help="Fetch CLOB books and rank by executable (depth-walked) EV")
+    parser.add_argument("--json", action="store_true", help="Print rows as JSON")
+    args = parser.parse_args()
+
+    from market_model import Market
+    from market_search import MarketSearchIndex
+    from market_store import MarketStore
+
+    store = MarketStore()
+    index = MarketSearchIndex().attach(store)
+    if args.sync:
+        store.sync()
+    records = [Market.from_gamma(raw) for raw in store.markets.values()]
+
+    try:
+        estimates = load_estimates(args.estimates)
+    except (OSError, ValueError) as e:
+        print(f"Error loading estimates: {e}")
+        sys.exit(1)
+
+    books = None
+    if args.books:
+        from orderbook import fetch_books, market_token_ids
+        matched = [market for _, market in match_estimates(estimates, records, index) if market is not None]
+        try:
+            books = fetch_books(market_token_ids(matched))
+        except Exception as e:
+            print(f"Error fetching books: {e}")
+            sys.exit(1)
+
+    rows = analyze(estimates, records, kelly_multiplier=args.kelly, bankroll=args.bankroll,
+                   books=books, index=index)[:args.top]
+    if args.joint:
+        add_joint_sizing(rows, args.kelly, args.bankroll)
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+    else:
+        print_report(rows, args.kelly, args.bankroll)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compact Market record for the scanner
+
+Gamma returns 80+ keys per market; the scanner uses about a dozen. Market
+keeps only those in __slots__ and decodes the stringified numeric fields
+(outcomePrices, clobTokenIds, liquidity, ...) to floats exactly once.
+"""
+import json
+import math
+from datetime import datetime
+
+# Gamma keys materialized by loads_markets() and kept by MarketStore
+# (events keep id/title/slug/category; description is for market_search)
+WANTED_KEYS = frozenset({
+    "id", "conditionId", "question", "slug", "updatedAt", "endDate",
+    "active", "closed", "archived", "negRisk", "outcomePrices", "clobTokenIds",
+    "bestBid", "bestAsk", "lastTradePrice", "spread", "liquidityNum",
+    "volume24hr", "orderMinSize", "oneHourPriceChange", "oneDayPriceChange",
+    "feesEnabled", "events", "title", "category", "description",
+})
+
+
+def _float(value, default=math.nan):
+    if value is None or value == "":
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _json_list(value):
+    """Gamma encodes some lists as JSON strings"""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return value or []
+
+
+def _epoch(value):
+    if not value:
+        return math.nan
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return math.nan
+
+
+class Market:
+    """Slotted market record holding only the fields the scanner uses"""
+
+    __slots__ = (
+        "id", "condition_id", "question", "slug", "updated_at", "end_ts",
+        "closed", "neg_risk", "fees_enabled", "yes_price", "no_price",
+        "yes_token", "no_token", "best_bid", "best_ask", "last_trade_price",
+        "spread", "liquidity", "volume_24hr", "order_min_size",
+        "one_hour_change", "one_day_change", "event_id", "event_title", "category",
+    )
+
+    @classmethod
+    def from_gamma(cls, raw):
+        """Build a Market from a (full or pre-filtered) Gamma market dict"""
+        m = cls.__new__(cls)
+        m.id = raw["id"]
+        m.condition_id = raw.get("conditionId")
+        m.question = raw.get("question", "")
+        m.slug = raw.get("slug", "")
+        m.updated_at = raw.get("updatedAt")
+        m.end_ts = _epoch(raw.get("endDate"))
+        m.closed = bool(raw.get("closed") or raw.get("archived") or not raw.get("active", True))
+        m.neg_risk = bool(raw.get("negRisk"))
+        m.fees_enabled = bool(raw.get("feesEnabled"))
+
+        prices = _json_list(raw.get("outcomePrices"))
+        m.yes_price = _float(prices[0]) if prices else math.nan
+        m.no_price = _float(prices[1]) if len(prices) > 1 else math.nan
+
+        tokens = _json_list(raw.get("clobTokenIds"))
+        m.yes_token = tokens[0] if tokens else None
+        m.no_token = tokens[1] if len(tokens) > 1 else None
+
+        m.best_bid = _float(raw.get("bestBid"))
+        m.best_ask = _float(raw.get("bestAsk"))
+        m.last_trade_price = _float(raw.get("lastTradePrice"))
+        m.spread = _float(raw.get("spread"))
+        m.liquidity = _float(raw.get("liquidityNum"), 0.0)
+        m.volume_24hr = _float(raw.get("volume24hr"), 0.0)
+        m.order_min_size = _float(raw.get("orderMinSize"), 0.0)
+        m.one_hour_change = _float(raw.get("oneHourPriceChange"), 0.0)
+        m.one_day_change = _float(raw.get("oneDayPriceChange"), 0.0)
+
+        events = raw.get("events") or []
+        m.event_id = events[0].get("id") if events else None
+        m.event_title = events[0].get("title", "") if events else ""
+        m.category = raw.get("category") or (events[0].get("category") if events else None)
+        return m
+
+    def __repr__(self):
+        return f"Market({self.id!r}, {self.question!r}, yes={self.yes_price}, no={self.no_price})"
+
+
+def _keep_wanted(pairs):
+    """object_pairs_hook: drop unused keys as each JSON object is decoded"""
+    return {key: value for key, value in pairs if key in WANTED_KEYS}
+
+
+def compact(raw):
+    """Copy of an already-decoded Gamma market dict with only WANTED_KEYS"""
+    market = {key: value for key, value in raw.items() if key in WANTED_KEYS}
+    if market.get("events"):
+        market["events"] = [
+            {key: value for key, value in event.items() if key in WANTED_KEYS}
+            for event in market["events"]
+        ]
+    return market
+
+
+def loads_markets(text):
+    """
+    Decode a Gamma /markets JSON page straight into Market records
+
+    Unused keys are discarded while decoding, so the full 80-key dicts never
+    coexist for a whole page.
+    """
+    raw_markets = json.loads(text, object_pairs_hook=_keep_wanted)
+    return [Market.from_gamma(raw) for raw in raw_markets]
+
+
+if __name__ == "__main__":
+    import sys
+    import tracemalloc
+
+    path = sys.argv[1] if len(sys.argv) > 1 else "/root/openclaw_data/lin/data/markets_snapshot.json"
+    with open(path, 'r') as f:
+        text = f.read()
+
+    tracemalloc.start()
+    dicts = json.loads(text)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    del dicts
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    records = loads_markets(text)
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"Markets: {len(records)}")
+    print(f"Full dicts: {dict_bytes / 1024:.1f} KiB | Market records: {record_bytes / 1024:.1f} KiB")
@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Free-text search over the market universe
+
+Matches research claims ("Canada wins Olympic hockey gold") to Polymarket
+questions. Every market's question, slug, description and event titles
+are tokenized into an inverted index (token -> {market_id: field weight}).
+A trigram index over the vocabulary adds fuzzy matching: a query token
+that isn't in the vocabulary, or is spelled differently (seahawk /
+seahawks), expands to vocabulary tokens with similar trigrams.
+
+Numbers are normalized before tokenizing ("500,000" and "500K" both
+become 500000) and only ever match exactly, so sibling range markets
+("500,000-750,000" vs "250,000-500,000") are told apart by their bounds.
+
+Scoring is IDF-weighted and normalized by the query, so 1.0 means every
+query token was found exactly in a question. Description hits count for
+less than question or title hits.
+
+The index hangs off MarketStore.listeners, so a delta sync re-indexes only
+the markets it changed. Markets whose text didn't change are skipped.
+"""
+import heapq
+import math
+import re
+import time
+
+# Field weights: where a token appears matters more than how often
+FIELD_WEIGHTS = (
+    ("question", 1.0),
+    ("event", 0.8),
+    ("slug", 0.6),
+    ("description", 0.3),
+)
+STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "if",
+    "in", "is", "it", "of", "on", "or", "that", "the", "this", "to", "was", "will", "with",
+})
+MIN_SIMILARITY = 0.45      # trigram Jaccard for a fuzzy token match
+MIN_SCORE = 0.75           # weakest match market_analysis trusts without a market_id
+NUMERIC_MIN_SCORE = 0.5    # ... when the hit contains every number in the query
+TIE_MARGIN = 0.05          # a runner-up this close makes a match ambiguous
+DEFAULT_LIMIT = 10
+
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+_SCALED = re.compile(r"\b(\d+(?:\.\d+)?)([km])\b")
+_NUMBER = re.compile(r"[0-9]+(?:\.[0-9]+)?")
+_SCALE = {"k": 1_000, "m": 1_000_000}
+
+
+def _unscale(match):
+    value = float(match.group(1)) * _SCALE[match.group(2)]
+    return str(int(value)) if value.is_integer() else str(value)
+
+
+def tokenize(text):
+    """Lowercase alphanumeric tokens without stopwords ("500,000" / "500K" -> "500000")"""
+    if not text:
+        return []
+    text = _SCALED.sub(_unscale, _THOUSANDS.sub("", text.lower()))
+    return [t for t in _TOKEN.findall(text) if t not in STOPWORDS]
+
+
+def trigrams(token):
+    """Boundary-padded trigrams ('$se', 'sea', ..., 'ks$')"""
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _fields(market):
+    """(field name, text) pairs of a raw Gamma market dict"""
+    events = market.get("events") or []
+    return (
+        ("question", market.get("question") or ""),
+        ("event", " ".join(e.get("title") or "" for e in events)),
+        ("slug", (market.get("slug") or "").replace("-", " ")),
+        ("description", market.get("description") or ""),
+    )
+
+
+class MarketSearchIndex:
+    """Inverted token index with trigram fuzzy expansion, updated per market"""
+
+    def __init__(self, min_similarity=MIN_SIMILARITY):
+        self.min_similarity = min_similarity
+        self.postings = {}        # token -> {market_id: weight}
+        self.by_trigram = {}      # trigram -> set of vocabulary tokens
+        self.doc_terms = {}       # market_id -> {token: weight}
+        self.doc_text = {}        # market_id -> hash of the indexed text
+        self.questions = {}       # market_id -> question
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    def attach(self, store):
+        """Index every market in a MarketStore and follow its changes"""
+        for market in store.markets.values():
+            self.add(market)
+        store.listeners.append(self.on_change)
+        return self
+
+    def on_change(self, change, market):
+        """MarketStore listener"""
+        if change == 'removed':
+            self.remove(market['id'])
+        else:
+            self.add(market)
+
+    def add(self, market):
+        """Index (or re-index) one raw Gamma market dict"""
+        market_id = market["id"]
+        fields = _fields(market)
+        fingerprint = hash(fields)
+        if self.doc_text.get(market_id) == fingerprint:
+            return False
+        self.remove(market_id)
+
+        terms = {}
+        for (_, text), (_, weight) in zip(fields, FIELD_WEIGHTS):
+            for token in tokenize(text):
+                if weight > terms.get(token, 0.0):
+                    terms[token] = weight
+        for token, weight in terms.items():
+            posting = self.postings.get(token)
+            if posting is None:
+                posting = self.postings[token] = {}
+                for gram in trigrams(token):
+                    self.by_trigram.setdefault(gram, set()).add(token)
+            posting[market_id] = weight
+
+        self.doc_terms[market_id] = terms
+        self.doc_text[market_id] = fingerprint
+        self.questions[market_id] = market.get("question") or ""
+        return True
+
+    def remove(self, market_id):
+        terms = self.doc_terms.pop(market_id, None)
+        if terms is None:
+            return False
+        for token in terms:
+            posting = self.postings[token]
+            del posting[market_id]
+            if not posting:
+                del self.postings[token]
+                for gram in trigrams(token):
+                    vocabulary = self.by_trigram[gram]
+                    vocabulary.discard(token)
+                    if not vocabulary:
+                        del self.by_trigram[gram]
+        self.doc_text.pop(market_id, None)
+        self.questions.pop(market_id, None)
+        return True
+
+    def _idf(self, token):
+        return math.log(1.0 + len(self.doc_terms) / len(self.postings[token]))
+
+    def expand(self, token):
+        """
+        Vocabulary tokens matching a query token, as {token: similarity}
+
+        Exact hits score 1.0; trigram neighbours score their Jaccard
+        similarity. Numbers and tokens shorter than three characters match
+        exactly only (500000 must not fuzzy-match 250000).
+        """
+        matches = {token: 1.0} if token in self.postings else {}
+        if len(token) < 3 or _NUMBER.fullmatch(token):
+            return matches
+        grams = trigrams(token)
+        shared = {}
+        for gram in grams:
+            for candidate in self.by_trigram.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        for candidate, common in shared.items():
+            if candidate in matches:
+                continue
+            similarity = common / (len(grams) + len(trigrams(candidate)) - common)
+            if similarity >= self.min_similarity:
+                matches[candidate] = similarity
+        return matches
+
+    def search(self, text, limit=DEFAULT_LIMIT, min_score=0.0):
+        """
+        Best-matching markets for free text
+
+        Returns:
+            list of {"market_id", "question", "score"} best first
+        """
+        query = list(dict.fromkeys(tokenize(text)))
+        if not query or not self.doc_terms:
+            return []
+
+        scores = {}
+        total = 0.0
+        for token in query:
+            matches = self.expand(token)
+            # Unknown tokens still count against the score at the rarest IDF
+            weight = max((self._idf(t) for t in matches), default=math.log(1.0 + len(self.doc_terms)))
+            total += weight
+            best = {}
+            for candidate, similarity in matches.items():
+                idf = self._idf(candidate)
+                for market_id, field_weight in self.postings[candidate].items():
+                    value = similarity * idf * field_weight
+                    if value > best.get(market_id, 0.0):
+                        best[market_id] = value
+            for market_id, value in best.items():
+                scores[market_id] = scores.get(market_id, 0.0) + value
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            {'market_id': market_id, 'question': self.questions[market_id], 'score': value / total}
+            for market_id, value in best if value / total >= min_score
+        ]
+
+    def match(self, text, min_score=MIN_SCORE, margin=TIE_MARGIN, numeric_min_score=NUMERIC_MIN_SCORE):
+        """
+        The single market ``text`` refers to, or None
+
+        A hit that contains every number in the text (range bounds, dates)
+        is trusted down to ``numeric_min_score``; others need ``min_score``.
+        None when a runner-up scores within ``margin`` of the best (e.g.
+        sibling range markets the text can't tell apart) rather than picking
+        one of them arbitrarily.
+        """
+        found = self.search(text, limit=2, min_score=min(min_score, numeric_min_score))
+        if not found or (len(found) > 1 and found[0]['score'] - found[1]['score'] < margin):
+            return None
+        best = found[0]
+        if best['score'] < min_score:
+            numbers = [token for token in tokenize(text) if _NUMBER.fullmatch(token)]
+            terms = self.doc_terms[best['market_id']]
+            if not numbers or any(token not in terms for token in numbers):
+                return None
+        return best
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from market_store import STORE_FILE, MarketStore
+
+    parser = argparse.ArgumentParser(description="Search markets by free text")
+    parser.add_argument("query", nargs="+")
+    parser.add_argument("--store", default=STORE_FILE, help="Market store JSON")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    index = MarketSearchIndex().attach(MarketStore(args.store))
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = index.search(" ".join(args.query), args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"✅ {len(index)} markets, {len(index.postings)} tokens indexed in {built:.2f}s; "
+          f"query in {elapsed:.2f} ms")
+    for result in results:
+        print(f"   {result['score']:.2f}  {result['question']} ({result['market_id']})")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Local Polymarket market store with incremental delta sync
+
+The first sync crawls the full active universe. Later syncs walk Gamma
+ordered by updatedAt (newest first) and stop at the stored high-water
+mark, so only markets changed since the last run are downloaded.
+
+Only the Gamma keys in market_model.WANTED_KEYS are kept, in memory and on
+disk; the other ~60 keys per market are dropped as each market is applied.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from fetch_markets import PAGE_SIZE, _fetch_page, get_session, iter_markets
+from market_model import compact
+from rate_limiter import PRIORITY_SCAN
+
+STORE_FILE = "/root/openclaw_data/lin/data/market_store.json"
+
+
+def _parse_ts(value):
+    """Parse a Gamma ISO timestamp ('...Z') into an aware datetime"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+def _is_live(market):
+    """True if the market is still tradable"""
+    return market.get('active', True) and not market.get('closed') and not market.get('archived')
+
+
+class MarketStore:
+    """In-place market store keyed by Gamma market id"""
+
+    def __init__(self, store_file=STORE_FILE):
+        self.store_file = store_file
+        self.markets = {}
+        self.by_condition = {}
+        self.high_water_mark = None
+        # Called as listener(change, market) for every added/updated/removed market
+        self.listeners = []
+        # Re-entrant so listeners may take it too; ScannerState shares it as state.lock
+        self.lock = threading.RLock()
+        # Serializes writers of the store file only; readers of markets never wait on it
+        self._save_lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Load persisted markets and high-water mark"""
+        if not os.path.exists(self.store_file):
+            return
+        with open(self.store_file, 'r') as f:
+            data = json.load(f)
+        self.high_water_mark = data.get("high_water_mark")
+        for market in data.get("markets", []):
+            self._put(compact(market))
+
+    def save(self):
+        """
+        Persist the store (compact JSON, no indent)
+
+        Only the snapshot is taken under ``lock``; serialization runs outside
+        it. apply() replaces market dicts rather than mutating them, so the
+        snapshot stays consistent while syncs continue.
+        """
+        with self.lock:
+            data = {
+                "high_water_mark": self.high_water_mark,
+                "markets": list(self.markets.values()),
+            }
+        os.makedirs(os.path.dirname(self.store_file), exist_ok=True)
+        tmp_file = self.store_file + ".tmp"
+        with self._save_lock:
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_file, self.store_file)
+
+    def _put(self, market):
+        self.markets[market['id']] = market
+        if market.get('conditionId'):
+            self.by_condition[market['conditionId']] = market['id']
+
+    def _drop(self, market_id):
+        market = self.markets.pop(market_id, None)
+        if market and market.get('conditionId'):
+            self.by_condition.pop(market['conditionId'], None)
+
+    def get(self, market_id):
+        return self.markets.get(market_id)
+
+    def get_by_condition(self, condition_id):
+        market_id = self.by_condition.get(condition_id)
+        return self.markets.get(market_id) if market_id else None
+
+    def apply(self, market):
+        """
+        Merge one market record into the store
+
+        Returns:
+            'added', 'updated', 'removed' or None if nothing changed
+        """
+        with self.lock:
+            market = compact(market)
+            market_id = market['id']
+            current = self.markets.get(market_id)
+
+            if not _is_live(market):
+                if current is None:
+                    return None
+                self._drop(market_id)
+                change = 'removed'
+            elif current is not None and current.get('updatedAt') == market.get('updatedAt'):
+                return None
+            else:
+                self._put(market)
+                change = 'updated' if current is not None else 'added'
+
+            for listener in self.listeners:
+                listener(change, market)
+            return change
+
+    def _iter_changed(self, page_size):
+        """Yield markets changed since the high-water mark, newest first"""
+        watermark = _parse_ts(self.high_water_mark)
+        # No active/closed filter: closures must reach us so we can drop them
+        params = {"order": "updatedAt", "ascending": "false"}
+        session = get_session()
+        offset = 0
+
+        while True:
+            page = _fetch_page(session, params, offset, page_size, priority=PRIORITY_SCAN)
+            for market in page:
+                updated_at = market.get('updatedAt')
+                # Ties at the watermark are re-applied; apply() skips unchanged ones
+                if updated_at and _parse_ts(updated_at) < watermark:
+                    return
+                yield market
+            if len(page) < page_size:
+                return
+            offset += page_size
+
+    def sync(self, page_size=PAGE_SIZE, stop=None):
+        """
+        Bring the store up to date
+
+        The high-water mark only moves once the whole crawl or delta walk has
+        been consumed; if a page fails, or ``stop`` (a threading.Event) is set
+        mid-walk, the next sync starts from the old mark and picks up whatever
+        was missed.
+
+        Returns:
+            dict: counts of added / updated / removed / fetched markets
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0, "fetched": 0}
+
+        if self.high_water_mark is None:
+            source = iter_markets(page_size=page_size)
+        else:
+            source = self._iter_changed(page_size)
+
+        newest = self.high_water_mark
+        for market in source:
+            if stop is not None and stop.is_set():
+                return stats
+            stats["fetched"] += 1
+            updated_at = market.get('updatedAt')
+            if updated_at and (newest is None or _parse_ts(updated_at) > _parse_ts(newest)):
+                newest = updated_at
+            change = self.apply(market)
+            if change:
+                stats[change] += 1
+
+        with self.lock:
+            self.high_water_mark = newest
+        return stats
+
+
+def main():
+    store = MarketStore()
+    started = time.monotonic()
+
+    try:
+        stats = store.sync()
+    except Exception as e:
+        print(f"Error: {e}")
+        return None
+
+    if stats["added"] or stats["updated"] or stats["removed"]:
+        store.save()
+
+    elapsed = time.monotonic() - started
+    print(f"✅ Synced in {elapsed:.2f}s: {json.dumps(stats)}")
+    print(f"   Markets: {len(store.markets)} | High-water mark: {store.high_water_mark}")
+    return stats
+
+
+if __name__ == "__main__":
+    main()
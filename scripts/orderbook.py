@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+CLOB order book ingestion for clobTokenIds
+
+Books are fetched in batches through POST /books and stored as sorted
+numpy price/size arrays per side (bids best-first descending, asks
+best-first ascending) instead of lists of {"price", "size"} dicts.
+
+Requires: pip install numpy
+"""
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_session import get_session
+from rate_limiter import PRIORITY_SCAN
+
+CLOB_API_URL = os.getenv("CLOB_API_URL", "https://clob.polymarket.com")
+BOOKS_URL = f"{CLOB_API_URL}/books"
+
+BATCH_SIZE = 100
+MAX_WORKERS = 8
+
+
+class OrderBook:
+    """One token's book as sorted numeric arrays"""
+
+    __slots__ = ("token_id", "market", "timestamp", "hash",
+                 "bid_px", "bid_sz", "ask_px", "ask_sz")
+
+    def __init__(self, token_id, bid_px, bid_sz, ask_px, ask_sz, market=None, timestamp=0, hash=None):
+        self.token_id = token_id
+        self.market = market
+        self.timestamp = timestamp
+        self.hash = hash
+        self.bid_px = bid_px
+        self.bid_sz = bid_sz
+        self.ask_px = ask_px
+        self.ask_sz = ask_sz
+
+    @property
+    def best_bid(self):
+        return float(self.bid_px[0]) if len(self.bid_px) else np.nan
+
+    @property
+    def best_ask(self):
+        return float(self.ask_px[0]) if len(self.ask_px) else np.nan
+
+    def ask_depth(self, max_price):
+        """Shares available at or below ``max_price``"""
+        n = int(np.searchsorted(self.ask_px, max_price, side='right'))
+        return float(self.ask_sz[:n].sum())
+
+    def bid_depth(self, min_price):
+        """Shares bid at or above ``min_price``"""
+        n = int(np.searchsorted(-self.bid_px, -min_price, side='right'))
+        return float(self.bid_sz[:n].sum())
+
+    def __repr__(self):
+        return (f"OrderBook({self.token_id[:10]}..., bid={self.best_bid} x{len(self.bid_px)}, "
+                f"ask={self.best_ask} x{len(self.ask_px)})")
+
+
+def _side_arrays(levels, descending):
+    """[{"price": "0.5", "size": "10"}, ...] -> sorted (price, size) float arrays"""
+    if not levels:
+        empty = np.empty(0, dtype=np.float64)
+        return empty, empty
+    px = np.fromiter((float(level["price"]) for level in levels), dtype=np.float64, count=len(levels))
+    sz = np.fromiter((float(level["size"]) for level in levels), dtype=np.float64, count=len(levels))
+    order = np.argsort(-px if descending else px, kind='stable')
+    return px[order], sz[order]
+
+
+def parse_book(raw):
+    """Convert a CLOB /book(s) payload into an OrderBook"""
+    bid_px, bid_sz = _side_arrays(raw.get("bids"), descending=True)
+    ask_px, ask_sz = _side_arrays(raw.get("asks"), descending=False)
+    return OrderBook(
+        raw["asset_id"], bid_px, bid_sz, ask_px, ask_sz,
+        market=raw.get("market"),
+        timestamp=int(raw.get("timestamp") or 0),
+        hash=raw.get("hash"),
+    )
+
+
+def _fetch_batch(session, token_ids, priority, stop=None):
+    if stop is not None and stop.is_set():
+        return []
+    payload = [{"token_id": token_id} for token_id in token_ids]
+    response = session.post(BOOKS_URL, json=payload, timeout=10, endpoint="clob:books", priority=priority)
+    response.raise_for_status()
+    return [parse_book(raw) for raw in response.json()]
+
+
+def fetch_books(token_ids, batch_size=BATCH_SIZE, max_workers=MAX_WORKERS, priority=PRIORITY_SCAN,
+                stop=None):
+    """
+    Fetch order books for many token ids at once
+
+    Token ids are split into ``batch_size`` chunks posted concurrently.
+    Batches not yet sent when ``stop`` (a threading.Event) is set are skipped.
+
+    Returns:
+        dict: token_id -> OrderBook (tokens without a book are omitted)
+    """
+    token_ids = list(dict.fromkeys(token_ids))
+    session = get_session()
+    books = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [
+            pool.submit(_fetch_batch, session, token_ids[i:i + batch_size], priority, stop)
+            for i in range(0, len(token_ids), batch_size)
+        ]
+        for future in as_completed(futures):
+            for book in future.result():
+                books[book.token_id] = book
+
+    return books
+
+
+def market_token_ids(markets):
+    """Collect clobTokenIds from Gamma market dicts or Market records"""
+    token_ids = []
+    for market in markets:
+        if isinstance(market, dict):
+            tokens = market.get("clobTokenIds")
+            token_ids.extend(json.loads(tokens) if isinstance(tokens, str) else tokens or [])
+        else:
+            token_ids.extend(t for t in (market.yes_token, market.no_token) if t)
+    return token_ids
+
+
+if __name__ == "__main__":
+    snapshot = sys.argv[1] if len(sys.argv) > 1 else "/root/openclaw_data/lin/data/markets_snapshot.json"
+    with open(snapshot, 'r') as f:
+        token_ids = market_token_ids(json.load(f))
+
+    started = time.monotonic()
+    try:
+        books = fetch_books(token_ids)
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    elapsed = time.monotonic() - started
+    levels = sum(len(b.bid_px) + len(b.ask_px) for b in books.values())
+    print(f"✅ {len(books)}/{len(token_ids)} books, {levels} levels in {elapsed:.2f}s")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Joint Kelly sizing for correlated bets
+
+Per-market Kelly treats every bet as independent. Sibling buckets of one
+negRisk event (e.g. the deportation ranges) are mutually exclusive, so
+sizing each bucket alone over-bets the cluster. Here bets are sized
+together against a scenario matrix of joint outcomes:
+
+  maximize   E_s[ log(1 + R_s . f) ]             expected log growth
+  subject to 0 <= f_i <= max_fraction, sum f <= max_total
+             CVaR_alpha(loss) <= max_drawdown     tail loss of one resolution
+
+Scenarios:
+  - markets in the same exclusive group: exactly one winner (or none)
+  - other markets/groups: independent, or correlated through a Gaussian
+    copula over groups when a correlation matrix is given
+
+Solved by projected gradient ascent with backtracking, all in numpy. CVaR
+is positively homogeneous in f, so the drawdown constraint is enforced by
+rescaling onto its boundary.
+
+Requires: pip install numpy
+"""
+import numpy as np
+
+from market_analysis import FEE_RATE, MAX_POSITION_FRACTION, NO, YES
+
+N_SCENARIOS = 10_000
+MAX_TOTAL = 0.95          # never stake the whole bankroll at once
+MAX_DRAWDOWN = 0.30       # max acceptable loss (risk_management.md)
+CVAR_ALPHA = 0.95
+MAX_ITER = 500
+TOLERANCE = 1e-9
+
+
+def _group_index(groups, n):
+    """Map group labels to 0..G-1; markets without a group get their own"""
+    if groups is None:
+        return np.arange(n), n
+    labels = {}
+    index = np.empty(n, dtype=np.int64)
+    for i, group in enumerate(groups):
+        key = ('market', i) if group is None else ('group', group)
+        index[i] = labels.setdefault(key, len(labels))
+    return index, len(labels)
+
+
+def scenario_matrix(prob, groups=None, corr=None, n_scenarios=N_SCENARIOS, seed=0):
+    """
+    Sample joint YES outcomes
+
+    Args:
+        prob: YES probability per market
+        groups: optional label per market; markets sharing a label are
+            mutually exclusive (at most one resolves YES)
+        corr: optional G x G correlation between groups (in order of first
+            appearance) for a Gaussian copula; independent otherwise
+        n_scenarios: number of sampled scenarios
+
+    Returns:
+        (S, N) bool array, True where the market resolves YES
+    """
+    prob = np.asarray(prob, dtype=np.float64)
+    n = len(prob)
+    rng = np.random.default_rng(seed)
+    group, n_groups = _group_index(groups, n)
+
+    if corr is None:
+        u = rng.random((n_scenarios, n_groups))
+    else:
+        z = rng.standard_normal((n_scenarios, n_groups)) @ np.linalg.cholesky(np.asarray(corr)).T
+        # Rank transform to uniforms: exact marginals without an erf
+        u = (np.argsort(np.argsort(z, axis=0), axis=0) + 0.5) / n_scenarios
+
+    # Within a group, each market owns a slice of [0, 1) sized by its
+    # probability (rescaled if the group's probabilities exceed 1)
+    totals = np.bincount(group, weights=prob, minlength=n_groups)
+    scale = np.where(totals > 1.0, totals, 1.0)
+    width = prob / scale[group]
+    order = np.lexsort((np.arange(n), group))
+    width_sorted = width[order]
+    group_sorted = group[order]
+    cumulative = np.cumsum(width_sorted)
+    group_start = np.concatenate(([0.0], cumulative))[np.searchsorted(group_sorted, np.arange(n_groups))]
+    lower = np.empty(n)
+    lower[order] = cumulative - width_sorted - group_start[group_sorted]
+
+    draw = u[:, group]
+    return (draw >= lower) & (draw < lower + width)
+
+
+def bet_returns(outcomes, side, price, fee_rate=FEE_RATE):
+    """
+    Per-scenario return on $1 staked for each bet
+
+    Args:
+        outcomes: (S, N) YES outcomes from scenario_matrix
+        side: YES/NO per bet (market_analysis.YES / NO)
+        price: price paid for the chosen side
+    """
+    price = np.asarray(price, dtype=np.float64)
+    side = np.asarray(side)
+    wins = np.where(side == NO, ~outcomes, outcomes)
+    odds = (1.0 - price) * (1.0 - np.asarray(fee_rate, dtype=np.float64)) / price
+    return np.where(wins, odds, -1.0)
+
+
+def cvar(losses, alpha=CVAR_ALPHA):
+    """Mean of the worst (1 - alpha) share of losses"""
+    k = max(1, int(np.ceil((1.0 - alpha) * len(losses))))
+    return float(np.mean(np.partition(losses, -k)[-k:]))
+
+
+def _project(f, max_fraction, max_total):
+    """Euclidean projection onto {0 <= f <= max_fraction, sum f <= max_total}"""
+    clipped = np.clip(f, 0.0, max_fraction)
+    if clipped.sum() <= max_total:
+        return clipped
+    # Shift down by tau so the clipped sum meets the budget (bisection)
+    lo, hi = 0.0, float(f.max())
+    for _ in range(60):
+        tau = (lo + hi) / 2
+        if np.clip(f - tau, 0.0, max_fraction).sum() > max_total:
+            lo = tau
+        else:
+            hi = tau
+    return np.clip(f - hi, 0.0, max_fraction)
+
+
+def optimize(returns, max_fraction=MAX_POSITION_FRACTION, max_total=MAX_TOTAL, max_drawdown=MAX_DRAWDOWN,
+             alpha=CVAR_ALPHA, kelly_multiplier=1.0, max_iter=MAX_ITER):
+    """
+    Joint growth-optimal fractions for an (S, N) return matrix
+
+    ``kelly_multiplier`` scales the optimum afterwards (0.25 = Quarter-Kelly)
+    and must be positive; the position cap, budget and drawdown limit apply
+    to the scaled portfolio.
+
+    Returns:
+        dict: fractions, growth (expected log growth per resolution),
+        cvar (tail loss at alpha), iterations
+    """
+    if not kelly_multiplier > 0:
+        raise ValueError(f"kelly_multiplier must be > 0, got {kelly_multiplier}")
+    returns = np.asarray(returns, dtype=np.float64)
+    n = returns.shape[1]
+
+    def growth(f):
+        wealth = 1.0 + returns @ f
+        return -np.inf if wealth.min() <= 0 else float(np.mean(np.log(wealth)))
+
+    # Full-Kelly fractions above 1 can wipe out the bankroll in one scenario
+    cap = min(1.0, max_fraction / kelly_multiplier)
+    budget = min(1.0, max_total / kelly_multiplier)
+    limit = max_drawdown / kelly_multiplier
+
+    def constrain(f):
+        f = _project(f, cap, budget)
+        tail = cvar(-(returns @ f), alpha)
+        return f * (limit / tail) if tail > limit else f
+
+    f = constrain(np.full(n, min(cap, budget / max(n, 1)) * 0.1))
+    value = growth(f)
+    step = 1.0
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        gradient = returns.T @ (1.0 / (1.0 + returns @ f)) / len(returns)
+        while step > 1e-12:
+            candidate = constrain(f + step * gradient)
+            candidate_value = growth(candidate)
+            if candidate_value > value:
+                break
+            step *= 0.5
+        else:
+            break
+        improvement = candidate_value - value
+        f, value = candidate, candidate_value
+        step *= 2.0
+        if improvement < TOLERANCE:
+            break
+
+    f = f * kelly_multiplier
+    return {
+        'fractions': f,
+        'growth': growth(f),
+        'cvar': cvar(-(returns @ f), alpha),
+        'iterations': iterations,
+    }
+
+
+def size_jointly(side, price, prob_yes, groups=None, corr=None, fee_rate=FEE_RATE, kelly_multiplier=1.0,
+                 n_scenarios=N_SCENARIOS, seed=0, **constraints):
+    """scenario_matrix -> bet_returns -> optimize in one call"""
+    outcomes = scenario_matrix(prob_yes, groups, corr, n_scenarios, seed)
+    returns = bet_returns(outcomes, side, price, fee_rate)
+    return optimize(returns, kelly_multiplier=kelly_multiplier, **constraints)
+
+
+if __name__ == "__main__":
+    import time
+
+    from market_analysis import evaluate
+
+    # Five exclusive range buckets of one event (two look underpriced on
+    # their own), plus 295 independent markets with small edges
+    rng = np.random.default_rng(1)
+    bucket_prob = np.array([0.10, 0.25, 0.35, 0.20, 0.10])
+    bucket_price = np.array([0.07, 0.20, 0.37, 0.24, 0.12])
+    other_prob = rng.uniform(0.2, 0.8, 295)
+    other_price = np.clip(other_prob - rng.uniform(0.0, 0.06, 295), 0.02, 0.98)
+
+    prob = np.r_[bucket_prob, other_prob]
+    price = np.r_[bucket_price, other_price]
+    groups = ["deportations"] * 5 + [None] * 295
+    side = np.full(len(prob), YES)
+
+    independent = evaluate(price, prob, FEE_RATE, kelly_multiplier=1.0)['kelly']
+    started = time.perf_counter()
+    joint = size_jointly(side, price, prob, groups)
+    elapsed = time.perf_counter() - started
+
+    print(f"✅ {len(prob)} bets sized jointly in {elapsed:.2f}s ({joint['iterations']} iterations)")
+    print(f"   Independent Kelly total: {independent.sum():.2f}x bankroll "
+          f"(event cluster {independent[:5].sum():.2f})")
+    print(f"   Joint total: {joint['fractions'].sum():.2f} (event cluster {joint['fractions'][:5].sum():.2f}), "
+          f"growth {joint['growth']:.4f}, CVaR95 {joint['cvar']:.2%}")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Position book with incremental mark-to-market
+
+Holdings are indexed by CLOB token id. A price update for a token re-marks
+only the positions on that token and applies the change in value to the
+running totals and to the per-event and per-category exposure. Checking
+positions each tick therefore costs O(changed tokens), not O(holdings).
+
+Marks have a single source, the CLOB book midpoint passed to mark(); Gamma
+market updates only fill in metadata. Mixing the two made positions flip
+between prices every tick.
+
+positions.json is a list of holdings:
+  {"token_id": "...", "shares": 120, "avg_price": 0.0325,
+   "market_id": "...", "outcome": "YES", "question": "...",
+   "event_id": "...", "category": "Politics"}
+Only token_id, shares and avg_price are required. The other fields are
+filled in from the market store when a market update arrives.
+"""
+import json
+import math
+import os
+
+POSITIONS_FILE = "/root/openclaw_data/lin/data/positions.json"
+UNCATEGORIZED = "Uncategorized"
+
+
+class Position:
+    """One holding on one outcome token"""
+
+    # Keys read back from positions.json; to_dict() adds derived values that are ignored
+    FIELDS = ("token_id", "shares", "avg_price", "market_id", "outcome", "question",
+              "event_id", "category")
+
+    __slots__ = ("token_id", "shares", "avg_price", "market_id", "outcome", "question",
+                 "event_id", "category", "mark")
+
+    def __init__(self, token_id, shares, avg_price, market_id=None, outcome=None, question="",
+                 event_id=None, category=None):
+        self.token_id = token_id
+        self.shares = float(shares)
+        self.avg_price = float(avg_price)
+        self.market_id = market_id
+        self.outcome = outcome
+        self.question = question
+        self.event_id = event_id
+        self.category = category or UNCATEGORIZED
+        self.mark = math.nan
+
+    @property
+    def cost(self):
+        return self.shares * self.avg_price
+
+    @property
+    def value(self):
+        """Marked value; cost basis until the first price arrives"""
+        return self.cost if math.isnan(self.mark) else self.shares * self.mark
+
+    @property
+    def unrealized(self):
+        return self.value - self.cost
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from a positions.json row, also accepting to_dict() output"""
+        data = dict(data)
+        if 'question' not in data and 'market' in data:
+            data['question'] = data['market']
+        return cls(**{key: data[key] for key in cls.FIELDS if key in data})
+
+    def to_dict(self):
+        return {
+            'token_id': self.token_id,
+            'market_id': self.market_id,
+            'market': self.question,
+            'outcome': self.outcome,
+            'event_id': self.event_id,
+            'category': self.category,
+            'shares': self.shares,
+            'avg_price': self.avg_price,
+            'mark': None if math.isnan(self.mark) else self.mark,
+            'cost': self.cost,
+            'value': self.value,
+            'unrealized_pnl': self.unrealized,
+        }
+
+
+class PositionBook:
+    """Holdings by token id with running value and exposure aggregates"""
+
+    def __init__(self, positions_file=POSITIONS_FILE):
+        self.positions_file = positions_file
+        self.by_token = {}
+        self.total_cost = 0.0
+        self.total_value = 0.0
+        self.by_event = {}        # event_id -> marked value
+        self.by_category = {}     # category -> marked value
+        self.changed = set()      # tokens re-marked since the last drain_changed()
+        self._load()
+
+    def _load(self):
+        if not self.positions_file or not os.path.exists(self.positions_file):
+            return
+        with open(self.positions_file, 'r') as f:
+            for data in json.load(f):
+                self.add(Position.from_dict(data))
+
+    def __len__(self):
+        return len(self.by_token)
+
+    def _apply(self, position, sign):
+        """Add (sign=1) or remove (sign=-1) a position's contribution"""
+        value = sign * position.value
+        self.total_cost += sign * position.cost
+        self.total_value += value
+        if position.event_id is not None:
+            self.by_event[position.event_id] = self.by_event.get(position.event_id, 0.0) + value
+        self.by_category[position.category] = self.by_category.get(position.category, 0.0) + value
+
+    def add(self, position):
+        self.remove(position.token_id)
+        self.by_token[position.token_id] = position
+        self._apply(position, 1)
+
+    def remove(self, token_id):
+        position = self.by_token.pop(token_id, None)
+        if position is not None:
+            self._apply(position, -1)
+        return position
+
+    def mark(self, token_id, price):
+        """Re-mark one token; no-op for tokens we don't hold"""
+        position = self.by_token.get(token_id)
+        if position is None or math.isnan(price) or price == position.mark:
+            return False
+        self._apply(position, -1)
+        position.mark = price
+        self._apply(position, 1)
+        self.changed.add(token_id)
+        return True
+
+    def update_market(self, market):
+        """
+        Apply a market_model.Market update to the positions on its tokens
+
+        Fills in market metadata the positions file left out; prices are not
+        taken from Gamma (see mark()).
+
+        Returns:
+            bool: True if any position's metadata changed
+        """
+        changed = False
+        for token_id, outcome in ((market.yes_token, "YES"), (market.no_token, "NO")):
+            position = self.by_token.get(token_id) if token_id else None
+            if position is None:
+                continue
+            if (position.market_id is None or position.event_id is None
+                    or (position.category == UNCATEGORIZED and market.category)):
+                self._apply(position, -1)
+                position.market_id = position.market_id or market.id
+                position.outcome = position.outcome or outcome
+                position.question = position.question or market.question
+                position.event_id = position.event_id or market.event_id
+                if position.category == UNCATEGORIZED and market.category:
+                    position.category = market.category
+                self._apply(position, 1)
+                changed = True
+        return changed
+
+    def resum(self):
+        """Exact recomputation of the aggregates to shed float error"""
+        positions = list(self.by_token.values())
+        self.total_cost = self.total_value = 0.0
+        self.by_event = {}
+        self.by_category = {}
+        for position in positions:
+            self._apply(position, 1)
+
+    def report(self):
+        """Totals and exposure by event and category"""
+        return {
+            'positions': len(self.by_token),
+            'cost': self.total_cost,
+            'value': self.total_value,
+            'unrealized_pnl': self.total_value - self.total_cost,
+            'exposure_by_event': {k: v for k, v in self.by_event.items() if abs(v) > 1e-9},
+            'exposure_by_category': {k: v for k, v in self.by_category.items() if abs(v) > 1e-9},
+        }
+
+    def token_ids(self):
+        """Token ids currently held"""
+        return list(self.by_token)
+
+    def rows(self):
+        return [position.to_dict() for position in self.by_token.values()]
+
+    def drain_changed(self):
+        """Rows for positions re-marked since the previous call"""
+        changed, self.changed = self.changed, set()
+        return [self.by_token[token_id].to_dict() for token_id in changed if token_id in self.by_token]
+
+
+if __name__ == "__main__":
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else POSITIONS_FILE
+    book = PositionBook(path)
+    summary = book.report()
+    print(f"✅ {summary['positions']} positions, value ${summary['value']:,.2f}, "
+          f"unrealized ${summary['unrealized_pnl']:+,.2f}")
+    for category, value in sorted(summary['exposure_by_category'].items(), key=lambda kv: -kv[1]):
+        print(f"   {category}: ${value:,.2f}")
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Append-only columnar price history for Polymarket markets
+
+Each field lives in its own fixed-width binary column file. Every tick
+appends one row per market, so rows are ordered by timestamp and can be
+memory-mapped and sliced by time range (binary search on the ts column)
+and market without reading the rest of the history into RAM.
+
+Several processes may append to the same directory (the fetch_markets
+cron job and the heartbeat daemon); appends hold an flock on a lock file
+and reload the slot index under it, so slots are never handed out twice.
+
+Requires: pip install numpy
+"""
+import fcntl
+import json
+import os
+import time
+
+import numpy as np
+
+HISTORY_DIR = "/root/openclaw_data/lin/data/price_history"
+
+# (column, dtype) - outcomePrices is split into one column per outcome
+COLUMNS = (
+    ("ts", "<f8"),
+    ("market", "<i4"),
+    ("bestBid", "<f4"),
+    ("bestAsk", "<f4"),
+    ("lastTradePrice", "<f4"),
+    ("outcomePrice0", "<f4"),
+    ("outcomePrice1", "<f4"),
+    ("spread", "<f4"),
+    ("volume24hr", "<f8"),
+    ("liquidityNum", "<f8"),
+)
+
+PRICE_FIELDS = ("bestBid", "bestAsk", "lastTradePrice", "spread", "volume24hr", "liquidityNum")
+
+
+def _to_float(value):
+    """Gamma mixes numbers and numeric strings; missing values become NaN"""
+    if value is None or value == "":
+        return np.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _outcome_prices(market):
+    """Decode the stringified outcomePrices list into (yes, no)"""
+    prices = market.get('outcomePrices')
+    if isinstance(prices, str):
+        try:
+            prices = json.loads(prices)
+        except ValueError:
+            prices = None
+    if not prices:
+        return np.nan, np.nan
+    yes = _to_float(prices[0])
+    no = _to_float(prices[1]) if len(prices) > 1 else np.nan
+    return yes, no
+
+
+class PriceHistory:
+    """Append-only time-series store, one binary file per column"""
+
+    def __init__(self, root=HISTORY_DIR):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.index_file = os.path.join(root, "markets.json")
+        self.lock_file = os.path.join(root, "append.lock")
+        self._index_stat = None
+        self.slots = self._load_index()
+
+    def _stat_index(self):
+        try:
+            st = os.stat(self.index_file)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load_index(self):
+        """Load the market id -> slot mapping"""
+        self._index_stat = self._stat_index()
+        if self._index_stat is not None:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        return {}
+
+    def _refresh_index(self):
+        """Reload the slot index if another writer has changed it"""
+        if self._stat_index() != self._index_stat:
+            self.slots = self._load_index()
+
+    def _save_index(self):
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(self.slots, f, separators=(',', ':'))
+        os.replace(tmp_file, self.index_file)
+        self._index_stat = self._stat_index()
+
+    def _column_path(self, name):
+        return os.path.join(self.root, f"{name}.bin")
+
+    def _slot(self, market_id):
+        slot = self.slots.get(market_id)
+        if slot is None:
+            slot = self.slots[market_id] = len(self.slots)
+        return slot
+
+    def append(self, markets, ts=None):
+        """
+        Append one tick of price fields for the given markets
+
+        Args:
+            markets: Iterable of Gamma market dicts
+            ts: Unix timestamp of the tick (defaults to now)
+
+        Returns:
+            int: Number of rows written
+        """
+        markets = list(markets)
+        if not markets:
+            return 0
+
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                return self._append_locked(markets, time.time() if ts is None else ts)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _append_locked(self, markets, ts):
+        self._refresh_index()
+        known = len(self.slots)
+        rows = {name: [] for name, _ in COLUMNS}
+
+        for market in markets:
+            yes, no = _outcome_prices(market)
+            rows["ts"].append(ts)
+            rows["market"].append(self._slot(market['id']))
+            rows["outcomePrice0"].append(yes)
+            rows["outcomePrice1"].append(no)
+            for field in PRICE_FIELDS:
+                rows[field].append(_to_float(market.get(field)))
+
+        if len(self.slots) != known:
+            self._save_index()
+
+        # Another writer may have crashed mid-append since our last tick
+        self._truncate_torn_rows()
+
+        for name, dtype in COLUMNS:
+            with open(self._column_path(name), 'ab') as f:
+                f.write(np.asarray(rows[name], dtype=dtype).tobytes())
+
+        return len(markets)
+
+    def _row_count(self):
+        """Number of complete rows, i.e. the length all columns share"""
+        lengths = []
+        for name, dtype in COLUMNS:
+            path = self._column_path(name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            lengths.append(size // np.dtype(dtype).itemsize)
+        return min(lengths)
+
+    def _truncate_torn_rows(self):
+        """
+        Cut every column back to the shared row count before appending
+
+        A crash mid-append can leave some columns a row (or a partial value)
+        ahead; appending on top of that would pair every later row with the
+        previous tick's values in the longer columns.
+        """
+        n_rows = self._row_count()
+        for name, dtype in COLUMNS:
+            path = self._column_path(name)
+            if not os.path.exists(path):
+                continue
+            size = n_rows * np.dtype(dtype).itemsize
+            if os.path.getsize(path) != size:
+                with open(path, 'r+b') as f:
+                    f.truncate(size)
+
+    def _open_columns(self, names):
+        """Memory-map columns, trimmed to the row count all columns share"""
+        # A crash mid-append can leave columns uneven; ignore the partial row
+        n_rows = self._row_count()
+
+        columns = {}
+        dtypes = dict(COLUMNS)
+        for name in names:
+            if n_rows == 0:
+                columns[name] = np.empty(0, dtype=dtypes[name])
+            else:
+                columns[name] = np.memmap(self._column_path(name), dtype=dtypes[name], mode='r', shape=(n_rows,))
+        return columns
+
+    def read(self, market_id=None, start=None, end=None, fields=None):
+        """
+        Slice history by market and [start, end) time range
+
+        Only the rows inside the time range are touched; the market filter
+        is applied to that slice.
+
+        Returns:
+            dict: column name -> numpy array (includes 'ts')
+        """
+        fields = list(fields or [name for name, _ in COLUMNS if name not in ("ts", "market")])
+        columns = self._open_columns(["ts", "market"] + fields)
+        ts = columns["ts"]
+
+        lo = 0 if start is None else int(np.searchsorted(ts, start, side='left'))
+        hi = len(ts) if end is None else int(np.searchsorted(ts, end, side='left'))
+        selector = slice(lo, hi)
+
+        if market_id is not None:
+            self._refresh_index()
+            slot = self.slots.get(market_id)
+            if slot is None:
+                return {name: np.empty(0, dtype=dict(COLUMNS)[name]) for name in ["ts"] + fields}
+            selector = lo + np.flatnonzero(columns["market"][lo:hi] == slot)
+
+        result = {"ts": np.asarray(ts[selector])}
+        for name in fields:
+            result[name] = np.asarray(columns[name][selector])
+        return result
+
+    def __len__(self):
+        return len(self._open_columns(["ts"])["ts"])
+
+
+if __name__ == "__main__":
+    history = PriceHistory()
+    print(f"Rows: {len(history)} | Markets: {len(history.slots)}")
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Near-resolution watcher
+
+Markets settle on endDate, and the largest dislocations tend to show up in
+the final hours. Heat in scan_scheduler depends on the time left, but it
+is only recomputed when a market's record changes. A quiet market would
+therefore keep its week-out interval right up to the close.
+
+ResolutionWatch keeps active markets in a min-heap keyed by their next
+checkpoint before endDate. The checkpoints halve the remaining time from
+RESOLUTION_WINDOW down to a minute, then fall on endDate itself (a market
+first seen inside the window crosses once right away). Each tick pops
+only the markets that crossed a checkpoint, so nothing re-sorts the
+universe. The caller re-heats those markets; they also wait in `pending`
+until take_pending() hands them out for a data-update check. After endDate a market stays on a slow recheck cycle
+until `closed` flips and the store removes it, or until POST_END_GRACE has
+passed (stale records that never close stop being re-queued).
+
+Checkpoints and the pending queue can be persisted, so a cron run does not
+re-queue markets the previous run already reported, and markets beyond one
+run's budget are still reported by the next.
+"""
+import heapq
+import itertools
+import json
+import math
+import os
+import time
+
+from scan_scheduler import RESOLUTION_WINDOW
+
+MIN_CHECKPOINT = 60.0              # the last checkpoint before endDate itself
+POST_END_RECHECK = 10 * 60.0       # ended but not yet closed: recheck this often
+POST_END_GRACE = 24 * 3600.0       # ... and stop watching this long after endDate
+
+
+def checkpoints(window=RESOLUTION_WINDOW, smallest=MIN_CHECKPOINT):
+    """Seconds-before-endDate checkpoints, largest first: window, window/2, ..., 0"""
+    offsets = []
+    offset = float(window)
+    while offset >= smallest:
+        offsets.append(offset)
+        offset /= 2
+    offsets.append(0.0)
+    return tuple(offsets)
+
+
+CHECKPOINTS = checkpoints()
+
+
+class ResolutionWatch:
+    """Min-heap of markets keyed by their next checkpoint before endDate"""
+
+    def __init__(self, state_file=None, offsets=CHECKPOINTS, recheck=POST_END_RECHECK, grace=POST_END_GRACE):
+        self.state_file = state_file
+        self.offsets = offsets
+        self.recheck = recheck
+        self.grace = grace
+        self.entries = {}         # market_id -> [end_ts, due, version]
+        self.pending = set()      # crossed a checkpoint, not yet taken for a data check
+        self._heap = []           # (due, version, market_id)
+        self._version = itertools.count()
+        self._load()
+
+    def _load(self):
+        if not self.state_file or not os.path.exists(self.state_file):
+            return
+        with open(self.state_file, 'r') as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            data = {"checkpoints": data}
+        for market_id, end_ts, due in data["checkpoints"]:
+            entry = self.entries[market_id] = [end_ts, None, None]
+            self._push(market_id, entry, due)
+        self.pending = {market_id for market_id in data.get("pending", []) if market_id in self.entries}
+
+    def save(self):
+        """Persist each market's endDate and next checkpoint, and the pending queue"""
+        if not self.state_file:
+            return
+        os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+        tmp_file = self.state_file + ".tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump({
+                "checkpoints": [[market_id, e[0], e[1]] for market_id, e in self.entries.items()],
+                "pending": sorted(self.pending),
+            }, f, separators=(',', ':'))
+        os.replace(tmp_file, self.state_file)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _first_due(self, end_ts, now):
+        """Markets first seen inside the window count as crossing right away"""
+        return now if end_ts - self.offsets[0] <= now else end_ts - self.offsets[0]
+
+    def _next_due(self, end_ts, now):
+        """First checkpoint still ahead of ``now``, or the next post-end recheck"""
+        for offset in self.offsets:
+            if end_ts - offset > now:
+                return end_ts - offset
+        return now + self.recheck
+
+    def _push(self, market_id, entry, due):
+        entry[1] = due
+        entry[2] = next(self._version)
+        heapq.heappush(self._heap, (due, entry[2], market_id))
+
+    def update(self, market, now=None):
+        """Track a market_model.Market; closed, undated or long-ended markets are retired"""
+        now = time.time() if now is None else now
+        if market.closed or math.isnan(market.end_ts) or now - market.end_ts > self.grace:
+            self.remove(market.id)
+            return
+        entry = self.entries.get(market.id)
+        if entry is not None and entry[0] == market.end_ts:
+            return
+        entry = self.entries[market.id] = [market.end_ts, None, None]
+        self._push(market.id, entry, self._first_due(market.end_ts, now))
+
+    def remove(self, market_id):
+        # The heap entry goes stale and is skipped when popped
+        self.entries.pop(market_id, None)
+        self.pending.discard(market_id)
+
+    def pop_due(self, now=None):
+        """
+        Markets that crossed a checkpoint since the last call (also added
+        to ``pending``)
+
+        Returns:
+            list of (market_id, seconds until endDate; negative once ended),
+            soonest endDate first
+        """
+        now = time.time() if now is None else now
+        crossed = []
+        while self._heap and self._heap[0][0] <= now:
+            _, version, market_id = heapq.heappop(self._heap)
+            entry = self.entries.get(market_id)
+            if entry is None or entry[2] != version:
+                continue
+            if now - entry[0] > self.grace:
+                self.remove(market_id)
+                continue
+            crossed.append((market_id, entry[0] - now))
+            self.pending.add(market_id)
+            self._push(market_id, entry, self._next_due(entry[0], now))
+
+        if len(self._heap) > 2 * len(self.entries) + 1024:
+            self._heap = [(e[1], e[2], market_id) for market_id, e in self.entries.items()]
+            heapq.heapify(self._heap)
+        crossed.sort(key=lambda item: item[1])
+        return crossed
+
+    def take_pending(self, limit, now=None):
+        """
+        Remove and return up to ``limit`` pending markets, soonest endDate first
+
+        Returns:
+            list of (market_id, seconds until endDate)
+        """
+        now = time.time() if now is None else now
+        taken = sorted(self.pending, key=lambda market_id: self.entries[market_id][0])[:limit]
+        self.pending.difference_update(taken)
+        return [(market_id, self.entries[market_id][0] - now) for market_id in taken]
+
+    def retain(self, market_ids):
+        """Drop entries (e.g. loaded from disk) for markets no longer in the store"""
+        for market_id in [m for m in self.entries if m not in market_ids]:
+            self.remove(market_id)
+
+    def ending_within(self, seconds, now=None):
+        """Number of tracked markets whose endDate is within ``seconds`` (for metrics)"""
+        now = time.time() if now is None else now
+        return sum(1 for entry in self.entries.values() if entry[0] - now <= seconds)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from market_model import Market
+
+    snapshot = sys.argv[1] if len(sys.argv) > 1 else "/root/openclaw_data/lin/data/market_store.json"
+    with open(snapshot, 'r') as f:
+        data = json.load(f)
+    records = [Market.from_gamma(raw) for raw in (data["markets"] if isinstance(data, dict) else data)]
+
+    watch = ResolutionWatch()
+    for record in records:
+        watch.update(record)
+    now = time.time()
+    print(f"✅ {len(watch)} markets watched, {watch.ending_within(24 * 3600, now)} ending within 24h")
+
+    by_id = {record.id: record for record in records}
+    for market_id, remaining in watch.pop_due(now)[:10]:
+        print(f"   {remaining / 3600:+8.2f}h  {by_id[market_id].question[:60]}")
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Adaptive per-market scan scheduler
+
+Every market gets a heat score in [0, 1] from the fields Gamma already
+returns:
+  - price movement   |oneHourPriceChange|, |oneDayPriceChange|
+  - activity         volume24hr (log scale)
+  - tightness        spread (tight books trade)
+  - resolution       time left until endDate
+
+Heat maps geometrically onto a rescan interval between MIN_INTERVAL (hot)
+and MAX_INTERVAL (dormant). Close to endDate the interval is also capped
+so a market gets at least RESOLUTION_SCANS rescans over the time it has
+left (an hour out: every 30s). Markets sit in a min-heap keyed by next due
+time. A market's score is recomputed only when its record changes, and the
+heap entry is replaced lazily (stale entries are skipped on pop), so an
+update costs O(log n). Each tick pops at most ``limit`` due markets, which
+keeps the per-tick request budget fixed.
+"""
+import heapq
+import itertools
+import math
+import time
+
+MIN_INTERVAL = 5.0        # seconds between rescans of the hottest markets
+MAX_INTERVAL = 600.0      # ... and of dormant ones
+
+# Heat component weights (sum to 1)
+WEIGHT_MOVE = 0.4
+WEIGHT_VOLUME = 0.25
+WEIGHT_SPREAD = 0.15
+WEIGHT_RESOLUTION = 0.2
+
+HOUR_MOVE_SCALE = 0.05    # a 5c move in the last hour is fully hot
+DAY_MOVE_SCALE = 0.20     # ... as is a 20c move over the day
+VOLUME_SCALE = 6.0        # log10(volume24hr): $1M/day is fully hot
+SPREAD_SCALE = 0.10       # spreads at or above 10c count as cold
+RESOLUTION_WINDOW = 7 * 24 * 60 * 60    # heat ramps up over the final week
+RESOLUTION_SCANS = 120    # minimum rescans over the time left before endDate
+
+
+def heat(market, now=None):
+    """Heat score in [0, 1] for a market_model.Market"""
+    now = time.time() if now is None else now
+
+    move = max(
+        min(1.0, abs(market.one_hour_change) / HOUR_MOVE_SCALE),
+        min(1.0, abs(market.one_day_change) / DAY_MOVE_SCALE),
+    )
+    volume = min(1.0, math.log10(1.0 + max(0.0, market.volume_24hr)) / VOLUME_SCALE)
+    spread = 0.0 if math.isnan(market.spread) else max(0.0, 1.0 - market.spread / SPREAD_SCALE)
+
+    remaining = market.end_ts - now
+    if math.isnan(remaining) or remaining >= RESOLUTION_WINDOW:
+        resolution = 0.0
+    else:
+        resolution = 1.0 - max(0.0, remaining) / RESOLUTION_WINDOW
+
+    return (WEIGHT_MOVE * move + WEIGHT_VOLUME * volume
+            + WEIGHT_SPREAD * spread + WEIGHT_RESOLUTION * resolution)
+
+
+def interval_for(score, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+    """Geometric interpolation: heat 1 -> min_interval, heat 0 -> max_interval"""
+    score = min(1.0, max(0.0, score))
+    return max_interval * (min_interval / max_interval) ** score
+
+
+def resolution_interval(market, now, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+    """
+    Longest interval that still gives RESOLUTION_SCANS rescans before
+    endDate; no cap for undated or already ended markets
+    """
+    remaining = market.end_ts - now
+    if math.isnan(remaining) or remaining <= 0:
+        return max_interval
+    return min(max_interval, max(min_interval, remaining / RESOLUTION_SCANS))
+
+
+class ScanScheduler:
+    """Min-heap of markets keyed by next due time"""
+
+    def __init__(self, min_interval=MIN_INTERVAL, max_interval=MAX_INTERVAL):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.entries = {}         # market_id -> [heat, interval, last_scanned, due, version]
+        self._heap = []           # (due, version, market_id)
+        self._version = itertools.count()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _push(self, market_id, entry, due):
+        entry[3] = due
+        entry[4] = next(self._version)
+        heapq.heappush(self._heap, (due, entry[4], market_id))
+
+    def update(self, market, now=None):
+        """
+        Recompute one market's priority after its record changed (or, via
+        resolution_watch, as its endDate approaches)
+        """
+        if market.closed:
+            self.remove(market.id)
+            return
+        now = time.time() if now is None else now
+        score = heat(market, now)
+        interval = min(interval_for(score, self.min_interval, self.max_interval),
+                       resolution_interval(market, now, self.min_interval, self.max_interval))
+
+        entry = self.entries.get(market.id)
+        if entry is None:
+            # Unseen markets are due immediately
+            self.entries[market.id] = entry = [score, interval, None, now, None]
+            self._push(market.id, entry, now)
+            return
+
+        entry[0], entry[1] = score, interval
+        due = entry[3] if entry[2] is None else entry[2] + interval
+        if due != entry[3]:
+            self._push(market.id, entry, due)
+
+    def remove(self, market_id):
+        # The heap entry goes stale and is skipped when popped
+        self.entries.pop(market_id, None)
+
+    def pop_due(self, limit, now=None):
+        """
+        Up to ``limit`` market ids whose rescan is due, most overdue first;
+        each is rescheduled one interval from ``now``
+        """
+        now = time.time() if now is None else now
+        due = []
+        while self._heap and len(due) < limit and self._heap[0][0] <= now:
+            _, version, market_id = heapq.heappop(self._heap)
+            entry = self.entries.get(market_id)
+            if entry is None or entry[4] != version:
+                continue
+            entry[2] = now
+            self._push(market_id, entry, now + entry[1])
+            due.append(market_id)
+
+        # Compact once stale entries dominate the heap
+        if len(self._heap) > 2 * len(self.entries) + 1024:
+            self._heap = [(e[3], e[4], market_id) for market_id, e in self.entries.items()]
+            heapq.heapify(self._heap)
+        return due
+
+    def backlog(self, now=None):
+        """Number of markets currently overdue (for metrics)"""
+        now = time.time() if now is None else now
+        return sum(1 for entry in self.entries.values() if entry[3] <= now)
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from market_model import Market
+
+    snapshot = sys.argv[1] if len(sys.argv) > 1 else "/root/openclaw_data/lin/data/market_store.json"
+    with open(snapshot, 'r') as f:
+        data = json.load(f)
+    records = [Market.from_gamma(raw) for raw in (data["markets"] if isinstance(data, dict) else data)]
+
+    scheduler = ScanScheduler()
+    started = time.perf_counter()
+    for record in records:
+        scheduler.update(record)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"✅ {len(scheduler)} markets scheduled in {elapsed:.2f} ms")
+
+    hottest = sorted(scheduler.entries.items(), key=lambda item: item[1][1])[:10]
+    by_id = {record.id: record for record in records}
+    for market_id, entry in hottest:
+        print(f"   every {entry[1]:6.1f}s  heat {entry[0]:.2f}  {by_id[market_id].question[:60]}")
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+WebSocket market-data client with an in-memory live book
+
+Subscribes to the CLOB market channel for many asset ids (sharded across
+connections), applies "book" snapshots and incremental "price_change"
+updates, and serves top-of-book / depth reads to the scanner without any
+network round trip.
+
+Gap handling: the feed has no sequence numbers, so a gap is declared when
+an update arrives for an asset without a snapshot, when an asset's
+timestamps go backwards, or when a connection goes silent. Affected assets
+are resubscribed, which makes the server resend a fresh snapshot.
+
+Requires: pip install websockets numpy
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+import numpy as np
+import websockets
+
+from orderbook import OrderBook
+
+WS_MARKET_URL = os.getenv("CLOB_WS_URL", "wss://ws-subscriptions-clob.polymarket.com/ws/market")
+
+MAX_ASSETS_PER_CONNECTION = 500
+PING_INTERVAL = 10
+STALE_AFTER = 30
+RESYNC_TIMEOUT = 2.0
+MAX_BACKOFF = 30
+
+
+class LiveBook:
+    """Mutable per-asset book: price -> size per side plus cached top of book"""
+
+    __slots__ = ("asset_id", "bids", "asks", "best_bid", "best_ask", "timestamp", "_snapshot")
+
+    def __init__(self, asset_id):
+        self.asset_id = asset_id
+        self.bids = {}
+        self.asks = {}
+        self.best_bid = np.nan
+        self.best_ask = np.nan
+        self.timestamp = 0
+        self._snapshot = None
+
+    def load(self, bids, asks, timestamp):
+        self.bids = {float(l["price"]): float(l["size"]) for l in bids or [] if float(l["size"]) > 0}
+        self.asks = {float(l["price"]): float(l["size"]) for l in asks or [] if float(l["size"]) > 0}
+        self.timestamp = timestamp
+        self._refresh_top()
+
+    def update(self, side, price, size, timestamp):
+        levels = self.bids if side == "BUY" else self.asks
+        if size > 0:
+            levels[price] = size
+        else:
+            levels.pop(price, None)
+        self.timestamp = timestamp
+        # Only rescan a side when its best level was removed
+        if side == "BUY":
+            if size > 0 and (np.isnan(self.best_bid) or price > self.best_bid):
+                self.best_bid = price
+            elif size <= 0 and price == self.best_bid:
+                self.best_bid = max(self.bids) if self.bids else np.nan
+        else:
+            if size > 0 and (np.isnan(self.best_ask) or price < self.best_ask):
+                self.best_ask = price
+            elif size <= 0 and price == self.best_ask:
+                self.best_ask = min(self.asks) if self.asks else np.nan
+        self._snapshot = None
+
+    def _refresh_top(self):
+        self.best_bid = max(self.bids) if self.bids else np.nan
+        self.best_ask = min(self.asks) if self.asks else np.nan
+        self._snapshot = None
+
+    def snapshot(self):
+        """Sorted-array OrderBook view, rebuilt only after changes"""
+        if self._snapshot is None:
+            bid_px = np.array(sorted(self.bids, reverse=True), dtype=np.float64)
+            ask_px = np.array(sorted(self.asks), dtype=np.float64)
+            self._snapshot = OrderBook(
+                self.asset_id,
+                bid_px, np.array([self.bids[p] for p in bid_px], dtype=np.float64),
+                ask_px, np.array([self.asks[p] for p in ask_px], dtype=np.float64),
+                timestamp=self.timestamp,
+            )
+        return self._snapshot
+
+
+class MarketFeed:
+    """Sharded, self-healing market-channel consumer"""
+
+    def __init__(self, asset_ids, url=WS_MARKET_URL, per_connection=MAX_ASSETS_PER_CONNECTION,
+                 stale_after=STALE_AFTER, on_update=None, log=None):
+        self.url = url
+        self.per_connection = per_connection
+        self.stale_after = stale_after
+        self.on_update = on_update
+        # Called as log(message, level); defaults to printing
+        self.log = log or (lambda message, level="INFO": print(f"[{level}] {message}"))
+        self.books = {}
+        self.shards = []
+        self.stats = {"messages": 0, "updates": 0, "gaps": 0, "reconnects": 0, "resubscribes": 0, "crashes": 0}
+        self._sockets = {}
+        self._awaiting = {}
+        self._tasks = []
+        self._stopping = False
+        self._running = False
+        self._loop = None
+        self._stopped = None
+        self.subscribe(asset_ids)
+
+    # --- read API (loop thread only: books are mutated by the shard tasks) ---
+
+    def best(self, asset_id):
+        """(best_bid, best_ask) or (nan, nan) if the asset has no snapshot yet"""
+        book = self.books.get(asset_id)
+        if book is None:
+            return np.nan, np.nan
+        return book.best_bid, book.best_ask
+
+    def top_ask(self, asset_id):
+        """(best_ask, size at best_ask) or (nan, 0.0) if the asset has no snapshot yet"""
+        book = self.books.get(asset_id)
+        if book is None:
+            return np.nan, 0.0
+        price = book.best_ask
+        return price, book.asks.get(price, 0.0)
+
+    def book(self, asset_id):
+        book = self.books.get(asset_id)
+        return book.snapshot() if book is not None else None
+
+    def ready(self, asset_id):
+        return asset_id in self.books
+
+    def top_asks(self, asset_ids):
+        """{asset_id: (best_ask, size)} for the assets that have a snapshot"""
+        return {asset_id: self.top_ask(asset_id) for asset_id in asset_ids if asset_id in self.books}
+
+    def top_asks_threadsafe(self, asset_ids, timeout=5.0):
+        """
+        top_asks() for callers on other threads (e.g. scanner stages)
+
+        The read runs on the feed's loop, so it never sees a book halfway
+        through an update. Returns {} when the feed isn't running.
+        """
+        if not self._running:
+            return {}
+
+        async def read():
+            return self.top_asks(asset_ids)
+
+        return asyncio.run_coroutine_threadsafe(read(), self._loop).result(timeout)
+
+    # --- subscription management ---
+
+    def subscribe(self, asset_ids):
+        """Add assets; new shards start automatically if the feed is running"""
+        known = {a for shard in self.shards for a in shard}
+        for asset_id in asset_ids:
+            if asset_id in known:
+                continue
+            known.add(asset_id)
+            if not self.shards or len(self.shards[-1]) >= self.per_connection:
+                self.shards.append([])
+                if self._running:
+                    self._tasks.append(asyncio.ensure_future(self._run_shard(len(self.shards) - 1)))
+            shard_index = len(self.shards) - 1
+            self.shards[shard_index].append(asset_id)
+            ws = self._sockets.get(shard_index)
+            if ws is not None:
+                asyncio.ensure_future(self._send_subscribe(ws, [asset_id], runtime=True))
+
+    async def _send_subscribe(self, ws, asset_ids, runtime=False):
+        message = {"assets_ids": asset_ids, "type": "market"}
+        if runtime:
+            message["operation"] = "subscribe"
+        await ws.send(json.dumps(message))
+
+    async def _resync(self, ws, asset_ids):
+        """Drop local state for the assets and ask the server for fresh snapshots"""
+        now = time.monotonic()
+        # Don't re-request while a snapshot is on its way; retry if it never came
+        asset_ids = [a for a in asset_ids if now - self._awaiting.get(a, -RESYNC_TIMEOUT) >= RESYNC_TIMEOUT]
+        if not asset_ids:
+            return
+        for asset_id in asset_ids:
+            self.books.pop(asset_id, None)
+            self._awaiting[asset_id] = now
+        self.stats["gaps"] += len(asset_ids)
+        self.stats["resubscribes"] += 1
+        await self._send_subscribe(ws, list(asset_ids), runtime=True)
+
+    # --- message handling ---
+
+    def _handle_event(self, event, gaps):
+        kind = event.get("event_type")
+        timestamp = int(event.get("timestamp") or 0)
+
+        if kind == "book":
+            asset_id = event["asset_id"]
+            book = self.books.get(asset_id)
+            if book is None:
+                book = self.books[asset_id] = LiveBook(asset_id)
+            book.load(event.get("bids") or event.get("buys"), event.get("asks") or event.get("sells"), timestamp)
+            self._awaiting.pop(asset_id, None)
+            self._notify(asset_id, book)
+
+        elif kind == "price_change":
+            # Current format: price_changes[] each with its own asset_id;
+            # legacy format: one asset_id with changes[]
+            changes = event.get("price_changes")
+            if changes is None:
+                changes = [dict(c, asset_id=event.get("asset_id")) for c in event.get("changes", [])]
+            touched = set()
+            for change in changes:
+                asset_id = change.get("asset_id")
+                book = self.books.get(asset_id)
+                if book is None or timestamp < book.timestamp:
+                    gaps.add(asset_id)
+                    continue
+                book.update(change["side"], float(change["price"]), float(change["size"]), timestamp)
+                touched.add(asset_id)
+            for asset_id in touched:
+                self._notify(asset_id, self.books[asset_id])
+
+    def _notify(self, asset_id, book):
+        self.stats["updates"] += 1
+        if self.on_update is not None:
+            self.on_update(asset_id, book)
+
+    # --- connection loop ---
+
+    async def _pinger(self, ws, shard_index):
+        """Keep-alive, plus a sweep for assets whose snapshot never arrived"""
+        while True:
+            await asyncio.sleep(PING_INTERVAL)
+            await ws.send("PING")
+            missing = [a for a in self.shards[shard_index] if a not in self.books]
+            if missing:
+                await self._resync(ws, missing)
+
+    async def _run_shard(self, shard_index):
+        backoff = 1.0
+        while not self._stopping:
+            try:
+                async with websockets.connect(self.url, max_size=None) as ws:
+                    self._sockets[shard_index] = ws
+                    await self._send_subscribe(ws, list(self.shards[shard_index]))
+                    backoff = 1.0
+                    pinger = asyncio.ensure_future(self._pinger(ws, shard_index))
+                    try:
+                        await self._consume(ws)
+                    finally:
+                        pinger.cancel()
+                        self._sockets.pop(shard_index, None)
+            except (OSError, websockets.WebSocketException, asyncio.TimeoutError):
+                pass
+            except Exception as e:
+                # A bad message or handler bug must not silently take the shard's assets offline
+                self.stats["crashes"] += 1
+                self.log(f"Market feed shard {shard_index} crashed: {e!r}; restarting", "ERROR")
+            if self._stopping:
+                break
+            # Everything this shard knew is now suspect
+            for asset_id in self.shards[shard_index]:
+                self.books.pop(asset_id, None)
+                self._awaiting.pop(asset_id, None)
+            self.stats["reconnects"] += 1
+            await asyncio.sleep(backoff * random.uniform(0.5, 1.0))
+            backoff = min(MAX_BACKOFF, backoff * 2)
+
+    async def _consume(self, ws):
+        while True:
+            # Silence longer than stale_after means a dead connection
+            raw = await asyncio.wait_for(ws.recv(), timeout=self.stale_after)
+            if raw in ("PONG", "PING"):
+                continue
+            try:
+                payload = json.loads(raw)
+            except ValueError:
+                continue
+            self.stats["messages"] += 1
+            gaps = set()
+            for event in payload if isinstance(payload, list) else [payload]:
+                self._handle_event(event, gaps)
+            if gaps:
+                await self._resync(ws, gaps)
+
+    async def run(self):
+        """
+        Run every shard until stop() is called
+
+        Starting with no assets is fine: shards subscribed later start as
+        soon as subscribe() creates them.
+        """
+        self._stopping = False
+        self._loop = asyncio.get_running_loop()
+        self._stopped = asyncio.Event()
+        self._running = True
+        self._tasks = [asyncio.ensure_future(self._run_shard(i)) for i in range(len(self.shards))]
+        try:
+            await self._stopped.wait()
+        finally:
+            self._running = False
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+
+    async def stop(self):
+        self._stopping = True
+        for ws in list(self._sockets.values()):
+            await ws.close()
+        if self._stopped is not None:
+            self._stopped.set()
+
+
+# --- local stand-in socket server -------------------------------------------
+
+class StandinFeed:
+    """
+    Local market-channel server for tests and benchmarks
+
+    Sends a "book" snapshot per subscribed asset, then random price_change
+    updates at ``rate`` messages/sec. ``drop_rate`` discards a share of
+    snapshots so clients exercise gap detection and resync.
+    """
+
+    def __init__(self, state, rate=50.0, drop_rate=0.0, seed=0):
+        self.state = state
+        self.rate = rate
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.server = None
+
+    async def _handler(self, ws):
+        assets = []
+        sender = None
+        try:
+            async for raw in ws:
+                if raw == "PING":
+                    await ws.send("PONG")
+                    continue
+                message = json.loads(raw)
+                requested = message.get("assets_ids", [])
+                assets.extend(a for a in requested if a not in assets)
+                books = [self.state.book_for(a) for a in requested]
+                snapshots = [dict(b, event_type="book", timestamp=str(int(time.time() * 1000)))
+                             for b in books if b is not None and self.random.random() >= self.drop_rate]
+                if snapshots:
+                    await ws.send(json.dumps(snapshots))
+                if sender is None:
+                    sender = asyncio.ensure_future(self._updates(ws, assets))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if sender is not None:
+                sender.cancel()
+
+    async def _updates(self, ws, assets):
+        while True:
+            await asyncio.sleep(1.0 / self.rate)
+            asset_id = self.random.choice(assets)
+            price = round(self.random.uniform(0.01, 0.99), 2)
+            await ws.send(json.dumps({
+                "event_type": "price_change",
+                "timestamp": str(int(time.time() * 1000)),
+                "price_changes": [{
+                    "asset_id": asset_id,
+                    "price": f"{price:.2f}",
+                    "size": f"{self.random.choice([0, 50, 100, 250])}",
+                    "side": self.random.choice(["BUY", "SELL"]),
+                }],
+            }))
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.server = await websockets.serve(self._handler, host, port)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"ws://{host}:{port}"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def _demo(args):
+    from gamma_standin import StandinState, load_fixture, replicate
+    from orderbook import market_token_ids
+
+    markets, books = load_fixture(args.fixture)
+    state = StandinState(replicate(markets, args.markets), books)
+    asset_ids = market_token_ids(state.markets)
+
+    standin = StandinFeed(state, rate=args.rate, drop_rate=args.drop_rate)
+    url = await standin.start()
+    feed = MarketFeed(asset_ids, url=url)
+    runner = asyncio.ensure_future(feed.run())
+
+    await asyncio.sleep(args.seconds)
+    ready = sum(feed.ready(a) for a in asset_ids)
+    await feed.stop()
+    runner.cancel()
+    await standin.stop()
+    print(f"✅ {ready}/{len(asset_ids)} assets live | {json.dumps(feed.stats)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the market feed against a local stand-in")
+    parser.add_argument("--fixture", default="/root/openclaw_data/lin/data/markets_snapshot.json")
+    parser.add_argument("--markets", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=200.0, help="Stand-in updates/sec")
+    parser.add_argument("--drop-rate", type=float, default=0.05, help="Share of snapshots dropped")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    asyncio.run(_demo(parser.parse_args()))
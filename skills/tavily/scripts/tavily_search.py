@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Tavily AI Search - Optimized search for LLMs and AI applications
-Requires: pip install tavily-python
+Requires: pip install tavily-python (only when the shared http_session
+transport from the workspace root is not importable)
 """
 
 import argparse
@@ -10,6 +11,28 @@ import sys
 import os
 from typing import Optional, List
 
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# Route through the workspace's pooled transport when installed there
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+try:
+    from http_session import get_session
+except ImportError:
+    get_session = None
+
+
+def _post_search(api_key: str, search_params: dict) -> dict:
+    """POST a search to the Tavily REST API over the shared keep-alive pool"""
+    response = get_session().post(
+        TAVILY_SEARCH_URL,
+        headers={"Authorization": f"Bearer {api_key}"},
+        json=search_params,
+        timeout=30,
+        endpoint="tavily:search",
+    )
+    response.raise_for_status()
+    return response.json()
+
 
 def search(
     query: str,
@@ -41,13 +64,14 @@ def search(
     Returns:
         dict: Tavily API response
     """
-    try:
-        from tavily import TavilyClient
-    except ImportError:
-        return {
-            "error": "tavily-python package not installed. Run: pip install tavily-python",
-            "install_command": "pip install tavily-python"
-        }
+    if get_session is None:
+        try:
+            from tavily import TavilyClient
+        except ImportError:
+            return {
+                "error": "tavily-python package not installed. Run: pip install tavily-python",
+                "install_command": "pip install tavily-python"
+            }
     
     if not api_key:
         return {
@@ -56,8 +80,6 @@ def search(
         }
     
     try:
-        client = TavilyClient(api_key=api_key)
-        
         # Build search parameters
         search_params = {
             "query": query,
@@ -74,7 +96,10 @@ def search(
         if exclude_domains:
             search_params["exclude_domains"] = exclude_domains
         
-        response = client.search(**search_params)
+        if get_session is not None:
+            response = _post_search(api_key, search_params)
+        else:
+            response = TavilyClient(api_key=api_key).search(**search_params)
         
         return {
             "success": True,
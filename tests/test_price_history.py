@@ -0,0 +1,41 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+from price_history import PriceHistory
+
+
+def _market(market_id, price):
+    return {"id": market_id, "bestBid": price, "bestAsk": price + 0.01, "lastTradePrice": price}
+
+
+def test_append_after_torn_row_keeps_columns_aligned(tmp_path):
+    history = PriceHistory(str(tmp_path))
+    history.append([_market("1", 0.10)], ts=100.0)
+
+    # Simulate a crash that wrote the ts column but nothing else
+    with open(history._column_path("ts"), 'ab') as f:
+        f.write(np.asarray([200.0], dtype="<f8").tobytes())
+    assert len(history) == 1
+
+    reopened = PriceHistory(str(tmp_path))
+    reopened.append([_market("1", 0.30)], ts=300.0)
+
+    data = reopened.read("1")
+    assert list(data["ts"]) == [100.0, 300.0]
+    np.testing.assert_allclose(data["bestBid"], [0.10, 0.30], rtol=1e-6)
+
+
+def test_writers_sharing_a_directory_get_distinct_slots(tmp_path):
+    cron = PriceHistory(str(tmp_path))
+    daemon = PriceHistory(str(tmp_path))
+    cron.append([_market("1", 0.10)], ts=100.0)
+    daemon.append([_market("2", 0.20)], ts=200.0)
+    cron.append([_market("3", 0.30)], ts=300.0)
+
+    reader = PriceHistory(str(tmp_path))
+    assert reader.slots == {"1": 0, "2": 1, "3": 2}
+    for market_id, price in (("1", 0.10), ("2", 0.20), ("3", 0.30)):
+        np.testing.assert_allclose(reader.read(market_id)["bestBid"], [price], rtol=1e-6)
@@ -0,0 +1,51 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "skills", "tavily", "scripts"))
+
+import http_session
+from rate_limiter import DEFAULT_LIMITS
+
+
+class _Response:
+    status_code = 200
+    headers = {}
+
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+def _record_acquires(monkeypatch, body):
+    session = http_session.get_session()
+    acquired = []
+    monkeypatch.setattr(session.scheduler, "acquire", lambda endpoint, priority: acquired.append(endpoint) or 0.0)
+    monkeypatch.setattr(session.client, "request", lambda method, url, **kwargs: _Response(body))
+    return acquired
+
+
+def test_tavily_search_waits_for_its_bucket(monkeypatch):
+    import tavily_search
+
+    acquired = _record_acquires(monkeypatch, {"results": []})
+    tavily_search._post_search("key", {"query": "x"})
+    assert acquired == ["tavily:search"]
+    assert "tavily:search" in DEFAULT_LIMITS
+
+
+def test_grok_chat_waits_for_its_bucket(monkeypatch):
+    from grok_twitter_automation import GrokTwitterBot
+
+    acquired = _record_acquires(monkeypatch, {"choices": [{"message": {"content": "ok"}}]})
+    bot = GrokTwitterBot()
+    bot.grok_api_key = "key"
+    assert bot._call_grok_api("hello") == "ok"
+    assert acquired == ["xai:chat"]
+    assert "xai:chat" in DEFAULT_LIMITS